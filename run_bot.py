@@ -5,6 +5,7 @@ import argparse
 def parse_args():
     parser = argparse.ArgumentParser(description="Run the bot with specified arguments.")
     parser.add_argument('-r', '--run-init', action='store_true', help='Run the script when the bot is starting.')
+    parser.add_argument('-f', '--full-rescan', action='store_true', help='Ignore saved sweep progress and page through every archived thread.')
     return parser.parse_args()
 
 
@@ -13,7 +14,7 @@ def main():
     
     args = parse_args()
     if args.run_init:
-        run(True)
+        run(True, args.full_rescan)
     else:
         run(False)
 
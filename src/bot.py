@@ -1,12 +1,25 @@
 import time
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import tasks
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-
-from src import db, utils, update
-from src.config import BOT_GUILD_ID, SERVER_CHANNEL_ID, USER_ID, CACHE_DURATION
+from apscheduler.triggers.interval import IntervalTrigger
+
+from src import db, utils, update, schedule
+from src.registry import tracked
+from src.bump import ArchiveBumper
+from src.cache import MonitoredCache
+from src.ratelimit import limiter
+from src.permissions import permissions
+from src.jobs import jobs
+from src.counter import monitored
+from src.stats import stats
+from src.search import names
+from src.threadmeta import thread_meta
+from src.plan import THREAD_PARENTS
+from src.config import BOT_GUILD_ID, SERVER_CHANNEL_ID, USER_ID, CACHE_STALE_WHILE_REVALIDATE, CACHE_FILL_CONCURRENCY, SWEEP_MODE, SWEEP_TICK_MINUTES, RECONCILE_INTERVAL_HOURS, JOB_PROGRESS_INTERVAL, COUNTER_RECONCILE_HOURS
 
 
 class MyBot(discord.Client):
@@ -14,29 +27,103 @@ class MyBot(discord.Client):
     intents.guilds = True
 
     def __init__(self):
-        super().__init__(intents=self.intents)
+        super().__init__(intents=self.intents, http_trace=limiter.trace_config())
         self.tree = app_commands.CommandTree(self)
         self.scheduler = AsyncIOScheduler()
         self.ready = False
-        self.monitored_cache = {}
-        self.cache_timestamp = {}
+        self.monitored_cache = MonitoredCache()
+        self.bumper = ArchiveBumper(self)
+        self.launched = time.perf_counter()
+        self.startup = None
+        self.startup_times: dict[str, float] = {}
+        self.restored: set[int] = set()
+
+    def record_phase(self, phase: str, started: float):
+        self.startup_times[phase] = time.perf_counter() - started
+
+    async def setup_hook(self):
+        self.record_phase("login", self.launched)
+        # Runs while the gateway connects, on_ready waits for it
+        self.startup = asyncio.create_task(self.prepare())
+
+    async def prepare(self):
+        started = time.perf_counter()
+        await db.setup()
+        self.record_phase("db", started)
+        await self.sync_commands()
+
+    async def sync_commands(self):
+        started = time.perf_counter()
+        key = f"command_hash:{self.application_id}"
+        current = utils.command_hash(self.tree)
+        if await db.get_setting(key) == current:
+            return
+        await self.tree.sync()
+        await db.set_setting(key, current)
+        self.record_phase("sync", started)
 
     async def on_ready(self):
         if self.ready:
             return
         self.ready = True
         print(f'Connected as {self.user}')
-        await self.tree.sync()
-        await db.setup()
+        self.record_phase("connect", self.launched)
+        await self.startup
+        started = time.perf_counter()
+        update.seed_monitored(self.guilds)
+        for guild in self.guilds:
+            names.load(guild)
+        self.bumper.load(self.guilds)
+        self.bumper.start()
+        self.record_phase("warm", started)
+        started = time.perf_counter()
+        self.restored = await update.load_thread_meta(self)
+        thread_meta.start()
+        self.record_phase("threads", started)
         
         self.start_scheduler()
         self.update_bot_status.start()
+        self.record_phase("total", self.launched)
+        sync = "" if "sync" in self.startup_times else ", commands unchanged"
+        print("Startup: " + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.startup_times.items()) + sync)
+
+    async def close(self):
+        self.bumper.stop()
+        await super().close()
+        await update.sweep_queue.close()
+        if self.startup is not None and self.startup.done():
+            await thread_meta.close()
+        await db.close_pool()
     
     def start_scheduler(self):
-        self.scheduler.add_job(update.forum_update, CronTrigger(hour=0, minute=0, second=0), args=[self])
+        if SWEEP_MODE == "rolling":
+            for guild_id in tracked.servers():
+                self.schedule_sweep(guild_id)
+        else:
+            self.scheduler.add_job(update.forum_update, CronTrigger(hour=0, minute=0, second=0), args=[self])
+        self.scheduler.add_job(update.reconcile_tracked, IntervalTrigger(hours=RECONCILE_INTERVAL_HOURS), args=[self], id="reconcile-tracked", coalesce=True)
+        if COUNTER_RECONCILE_HOURS:
+            self.scheduler.add_job(self.reconcile_monitored, IntervalTrigger(hours=COUNTER_RECONCILE_HOURS), id="reconcile-monitored",
+                                   coalesce=True, max_instances=1)
+            # Guilds restored from the thread metadata table skip the archive scan on startup
+            if cold := [guild_id for guild_id in tracked.servers() if guild_id not in self.restored]:
+                jobs.spawn(self.reconcile_monitored(cold))
+        self.scheduler.add_job(update.sweep_due_forums, IntervalTrigger(minutes=SWEEP_TICK_MINUTES), args=[self], id="sweep-due-forums", coalesce=True, max_instances=1)
         self.scheduler.start()
+
+    def schedule_sweep(self, guild_id: int):
+        if SWEEP_MODE == "rolling":
+            self.scheduler.add_job(update.process_server, schedule.sweep_trigger(guild_id), args=[guild_id, self],
+                                   id=schedule.sweep_job_id(guild_id), replace_existing=True, coalesce=True)
+
+    def unschedule_sweep(self, guild_id: int):
+        if self.scheduler.get_job(schedule.sweep_job_id(guild_id)):
+            self.scheduler.remove_job(schedule.sweep_job_id(guild_id))
     
     async def on_guild_join(self, guild: discord.Guild):
+        names.load(guild)
+        if tracked.has_server(guild.id):
+            self.schedule_sweep(guild.id)
         if guild_log := bot.get_guild(BOT_GUILD_ID):
             if channel_log := guild_log.get_channel(SERVER_CHANNEL_ID):
                 await channel_log.send(
@@ -49,36 +136,119 @@ class MyBot(discord.Client):
         if guild_log := bot.get_guild(BOT_GUILD_ID):
             if channel_log := guild_log.get_channel(SERVER_CHANNEL_ID):
                 await channel_log.send(f"❌ Removed from server: **{guild.name}** (ID: {guild.id})")
-        self.monitored_cache.pop(guild.id, None)
-        self.cache_timestamp.pop(guild.id, None)
+        self.monitored_cache.pop(guild.id)
+        permissions.invalidate(guild.id)
+        self.unschedule_sweep(guild.id)
+        await db.remove_server(guild.id)
+        monitored.forget(guild.id)
+        names.forget(guild.id)
+        thread_meta.forget(guild.id)
     
     @tasks.loop(hours=1)
     async def update_bot_status(self):
         await self.wait_until_ready()
-        post_set = await update.get_monitored_posts(self)
-        await self.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name=f"over {len(post_set)} posts"))
+        self.monitored_cache.purge_expired()
+        total_posts = monitored.count()
+        await self.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name=f"over {total_posts} posts"))
     
-    async def get_cached_monitored_posts(self, guild_id: int):
-        import time as time_module
-        now = time_module.time()
-        
-        if guild_id in self.monitored_cache:
-            if now - self.cache_timestamp.get(guild_id, 0) < CACHE_DURATION:
-                return self.monitored_cache[guild_id]
-        
-        monitored = await update.get_monitored_posts(self, guild_id)
-        self.monitored_cache[guild_id] = monitored
-        self.cache_timestamp[guild_id] = now
-        return monitored
+    async def get_cached_monitored_posts(self, guild_id: int, stale_while_revalidate: bool = CACHE_STALE_WHILE_REVALIDATE):
+        return await self.monitored_cache.get(guild_id, lambda: update.get_monitored_posts(self, guild_id), stale_while_revalidate)
+
+    async def reconcile_monitored(self, guild_ids: list[int] = None):
+        semaphore = asyncio.Semaphore(CACHE_FILL_CONCURRENCY)
+
+        async def reconcile(guild_id: int):
+            async with semaphore:
+                monitored.replace(guild_id, await self.get_cached_monitored_posts(guild_id, stale_while_revalidate=False))
+
+        await asyncio.gather(*(reconcile(guild_id) for guild_id in guild_ids or tracked.servers()))
     
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        permissions.invalidate(channel.guild.id, channel.id)
+        names.add(channel)
+
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if isinstance(after, discord.CategoryChannel):
+            permissions.invalidate(after.guild.id)  # Synced children inherit the category overwrites
+        else:
+            permissions.invalidate(after.guild.id, after.id)
+        names.add(after)
+        if isinstance(after, THREAD_PARENTS) and before.category_id != after.category_id:
+            self.move_monitored(after)
+
+    def move_monitored(self, channel: discord.abc.GuildChannel):
+        guild_id = channel.guild.id
+        if tracked.is_thread_monitored(guild_id, None, channel.id, channel.category_id):
+            for thread in channel.threads:
+                monitored.add(guild_id, thread.id, channel.id)
+            self.refresh_monitored(channel.guild, channel.id)  # Archived threads of the moved channel are only known to the API
+        else:
+            monitored.discard_parent(guild_id, channel.id, keep=tracked.channels(guild_id)['post'])
+            self.sync_monitored_cache(guild_id)
+
+    def refresh_monitored(self, guild: discord.Guild, channel_id: int):
+        jobs.spawn(self.add_monitored_channel(guild, channel_id))
+
+    async def add_monitored_channel(self, guild: discord.Guild, channel_id: int):
+        await update.add_monitored_channel(guild, channel_id)
+        self.sync_monitored_cache(guild.id)
+
+    def sync_monitored_cache(self, guild_id: int):
+        # The counter is current after targeted changes, a cached guild takes its ids instead of a rescan
+        if guild_id in self.monitored_cache:
+            self.monitored_cache.put(guild_id, monitored.ids(guild_id))
+
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        permissions.invalidate(channel.guild.id, channel.id)
+        names.remove(channel.guild.id, channel.id)
+        monitored.discard_parent(channel.guild.id, channel.id)
+        if tracked.exists(channel.guild.id, channel.id):
+            await db.remove_channel(channel.guild.id, channel.id)
+
+    async def on_guild_role_create(self, role: discord.Role):
+        permissions.invalidate(role.guild.id)
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        permissions.invalidate(after.guild.id)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        permissions.invalidate(role.guild.id)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.id == self.user.id:
+            permissions.invalidate(after.guild.id)
+
     async def on_thread_update(self, before: discord.Thread, after: discord.Thread):
-        if not before.archived and after.archived:
-            monitored_posts = await self.get_cached_monitored_posts(after.guild.id)
-            if after.id in monitored_posts:
-                try:
-                    await after.edit(archived=False)
-                except discord.Forbidden:
-                    pass
+        self.bumper.track(after)
+        names.add(after)
+        is_monitored = update.is_thread_monitored(after)
+        if is_monitored:
+            monitored.add(after.guild.id, after.id, after.parent_id)
+            thread_meta.record(after.guild.id, after)
+        elif monitored.discard(after.guild.id, after.id):
+            thread_meta.remove(after.id)
+        if not before.archived and after.archived and is_monitored:
+            if await update.unarchive(after):
+                stats.record_unarchive()
+
+    async def on_thread_create(self, thread: discord.Thread):
+        self.bumper.track(thread)
+        names.add(thread)
+        if update.is_thread_monitored(thread):
+            monitored.add(thread.guild.id, thread.id, thread.parent_id)
+            thread_meta.record(thread.guild.id, thread)
+
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        self.bumper.forget(payload.thread_id)
+        names.remove(payload.guild_id, payload.thread_id, 'post')
+        monitored.discard(payload.guild_id, payload.thread_id)
+        thread_meta.remove(payload.thread_id)
+        if tracked.exists(payload.guild_id, payload.thread_id):
+            await db.remove_channel(payload.guild_id, payload.thread_id)
+
+    async def on_message(self, message: discord.Message):
+        if isinstance(message.channel, discord.Thread):
+            self.bumper.touch(message.channel.id, message.created_at.timestamp(), message.channel.auto_archive_duration)
 
 
 bot = MyBot()
@@ -87,11 +257,20 @@ bot = MyBot()
 async def add_to_db(server_id, channel_type, channel_id):
     res = await db.add_element(server_id, channel_type, channel_id)
     if res:
+        if guild := bot.get_guild(server_id):
+            bot.bumper.load([guild])
+            bot.refresh_monitored(guild, channel_id)
+        if not bot.scheduler.get_job(schedule.sweep_job_id(server_id)):
+            bot.schedule_sweep(server_id)
         return f"<#{channel_id}> added."
     else:
         return f"<#{channel_id}> already in the db."
 
 
+def autocomplete_choices(guild_id: int, kind: str, current: str) -> list[app_commands.Choice]:
+    return [app_commands.Choice(name=name[:100], value=str(item_id)) for item_id, name in names.search(guild_id, kind, current)]
+
+
 @bot.tree.command(name="add_category", description="Add a category to monitor")
 @app_commands.describe(category="The category to add (use #channel or ID)")
 @app_commands.guild_only()
@@ -108,12 +287,7 @@ async def add_category(interaction: discord.Interaction, category: str):
 
 @add_category.autocomplete('category')
 async def autocomplete_categories(interaction: discord.Interaction, current: str):
-    categories = [channel for channel in interaction.guild.channels if isinstance(channel, discord.CategoryChannel)]
-    return [
-        app_commands.Choice(name=category.name, value=str(category.id))
-        for category in categories
-        if current.lower() in category.name.lower()
-    ]
+    return autocomplete_choices(interaction.guild.id, 'category', current)
 
 
 @bot.tree.command(name="add_forum", description="Add a specific forum to monitor")
@@ -132,12 +306,7 @@ async def add_forum(interaction: discord.Interaction, forum: str):
 
 @add_forum.autocomplete('forum')
 async def autocomplete_forum(interaction: discord.Interaction, current: str):
-    forums = [channel for channel in interaction.guild.channels if isinstance(channel, discord.ForumChannel)]
-    return [
-        app_commands.Choice(name=forum.name, value=str(forum.id))
-        for forum in forums
-        if current.lower() in forum.name.lower()
-    ]
+    return autocomplete_choices(interaction.guild.id, 'forum', current)
 
 
 @bot.tree.command(name="add_post", description="Add a specific post to monitor")
@@ -156,25 +325,14 @@ async def add_post(interaction: discord.Interaction, post: str):
 
 @add_post.autocomplete('post')
 async def autocomplete_post(interaction: discord.Interaction, current: str):
-    posts = []
-
-    for channel in interaction.guild.channels:
-        if isinstance(channel, (discord.ForumChannel, discord.TextChannel)):
-            for thread in channel.threads:
-                posts.append(thread)
-
-    return [
-        app_commands.Choice(name=post.name, value=str(post.id))
-        for post in posts
-        if current.lower() in post.name.lower()
-    ]
+    return autocomplete_choices(interaction.guild.id, 'post', current)
 
 
 @bot.tree.command(name="list_channels", description="List all channels.")
 @app_commands.guild_only()
 @app_commands.checks.has_permissions(manage_channels=True)
 async def list_channels(interaction: discord.Interaction):
-    channels_by_category = await db.get_channels(interaction.guild.id)
+    channels_by_category = tracked.channels(interaction.guild.id)
     response = ""
 
     for category_type, item_ids in channels_by_category.items():
@@ -196,10 +354,13 @@ async def list_channels(interaction: discord.Interaction):
 @app_commands.checks.has_permissions(manage_channels=True)
 async def remove_channel(interaction: discord.Interaction, channel: str):
     channel = utils.extract_id(channel)
-    if not await db.channel_exists(interaction.guild.id, channel):
+    if not tracked.exists(interaction.guild.id, channel):
         await interaction.response.send_message(f"Channel <#{channel}> (`{channel}`) not found in the database.")
     else:
+        channel_type = tracked.type_of(interaction.guild.id, channel)
         await db.remove_channel(interaction.guild.id, channel)
+        update.remove_monitored_channel(interaction.guild, channel, channel_type)
+        bot.sync_monitored_cache(interaction.guild.id)
         await interaction.response.send_message(f"<#{channel}> has been removed.")
 
 
@@ -214,21 +375,64 @@ async def info(interaction: discord.Interaction):
         "- </add_post:1290079934060040274>: Add a specific post\n"
         "- </list_channels:1290086788114944062>: List all channels\n"
         "- </remove_channel:1290086788114944063>: Remove a channel\n"
-        "- </run_update:1292600854297444362>: Update tracked chanels\n\n"
+        "- </run_update:1292600854297444362>: Update tracked chanels\n"
+        "- `/cancel_update`: Cancel a running update\n\n"
         "[Support server](<https://discord.gg/3b3qvn2aTc>)"
     )
     await interaction.response.send_message(info_message)
 
 
+def update_progress(sweep: update.ServerSweep, elapsed: float) -> str:
+    forums_done = sweep.forums_total - sweep.forums_pending
+    return (f"⏳ Updating: {forums_done}/{sweep.forums_total} {utils.pluralize('forum', sweep.forums_total)} listed, "
+            f"{sweep.unarchived_threads} {utils.pluralize('channel', sweep.unarchived_threads)} up, {utils.time_format(elapsed)} elapsed.")
+
+
 @app_commands.checks.has_permissions(manage_channels=True)
-@app_commands.checks.cooldown(1, 7200, key=lambda i: i.guild_id)  # Cooldown of 2 hoors per server
 @bot.tree.command(name="run_update", description="Update tracked channels.")
+@app_commands.guild_only()
 async def run_update(interaction: discord.Interaction):
-    await interaction.response.defer()
+    guild_id = interaction.guild.id
+    sweep = jobs.get(guild_id)
+    if sweep is None:
+        if jobs.busy():
+            return await interaction.response.send_message("Too many updates are running right now. Try again in a few minutes.", ephemeral=True)
+        retry_after = jobs.retry_after(guild_id)
+        if retry_after > 0:
+            return await interaction.response.send_message(f"An update ran recently. Try again in {utils.time_format(retry_after)}.", ephemeral=True)
+        await interaction.response.defer()
+        new_sweep = await update.new_server_sweep(bot, guild_id, force=True)
+        new_sweep.manual = True
+        sweep = jobs.add(new_sweep)
+        if sweep is new_sweep:
+            jobs.spawn(update.run_sweeps([sweep]))
+    else:
+        await interaction.response.defer()
+
     t_start = time.perf_counter()
-    channels_number = await update.process_server(interaction.guild.id, bot)
+    message = await interaction.followup.send(update_progress(sweep, 0), wait=True)
+    while not sweep.finished.is_set():
+        try:
+            await asyncio.wait_for(sweep.finished.wait(), JOB_PROGRESS_INTERVAL)
+        except asyncio.TimeoutError:
+            try:
+                await message.edit(content=update_progress(sweep, time.perf_counter() - t_start))
+            except discord.HTTPException:
+                return  # The interaction token expired, the sweep keeps running
+
     t_total = time.perf_counter() - t_start
-    await interaction.followup.send(f"{channels_number} channels up in {utils.time_format(t_total)}.")
+    status = "Update cancelled" if sweep.cancelled else "Update done"
+    await message.edit(content=f"{status}: {sweep.unarchived_threads} channels up in {utils.time_format(t_total)}.")
+
+
+@app_commands.checks.has_permissions(manage_channels=True)
+@bot.tree.command(name="cancel_update", description="Cancel the running update of this server.")
+@app_commands.guild_only()
+async def cancel_update(interaction: discord.Interaction):
+    if jobs.cancel(interaction.guild.id):
+        await interaction.response.send_message("🛑 The running update will stop after its current requests.", ephemeral=True)
+    else:
+        await interaction.response.send_message("⚠️ No update is running for this server.", ephemeral=True)
 
 
 @bot.tree.error
@@ -242,71 +446,62 @@ async def on_app_command_error(interaction: discord.Interaction, error: app_comm
         await interaction.response.send_message("An error occurred while executing the command.", ephemeral=True)
 
 
+STATS_FIELDS_PER_PAGE = 25
+STATS_SUMMARY_FIELDS = 5
+
+
+def stats_page_count(guild_count: int) -> int:
+    first_page = STATS_FIELDS_PER_PAGE - STATS_SUMMARY_FIELDS
+    return 1 + -(-max(guild_count - first_page, 0) // STATS_FIELDS_PER_PAGE)
+
+
+def stats_page(guild_ids: list[int], page: int) -> discord.Embed:
+    embed = discord.Embed(title="📊 Bot Statistics", color=discord.Color.blue())
+    first_page = STATS_FIELDS_PER_PAGE - STATS_SUMMARY_FIELDS
+    if page == 0:
+        total_guild = tracked.server_count()
+        embed.add_field(name=utils.pluralize("Total Server", total_guild), value=total_guild, inline=True)
+        embed.add_field(name=utils.pluralize("Total Thread", monitored.total), value=monitored.total, inline=True)
+        embed.add_field(name="Unarchived", value=f"{stats.unarchived} since start, {stats.sweeps} {utils.pluralize('sweep', stats.sweeps)}, {bot.bumper.bumped} bumped", inline=True)
+        cache_stats = bot.monitored_cache.stats()
+        embed.add_field(name="Cache", value=f"{cache_stats['entries']} {utils.pluralize('guild', cache_stats['entries'])}, {utils.size_format(cache_stats['bytes'])}, {cache_stats['hit_rate']:.0%} hits", inline=True)
+        limiter_stats = limiter.stats()
+        embed.add_field(name="Rate Limits", value=f"{limiter_stats['requests']} requests, {limiter_stats['rate_limited']} × 429, {utils.time_format(limiter_stats['throttled'])} throttled", inline=True)
+        start, end = 0, first_page
+    else:
+        start = first_page + (page - 1) * STATS_FIELDS_PER_PAGE
+        end = start + STATS_FIELDS_PER_PAGE
+
+    for guild_id in guild_ids[start:end]:
+        guild = bot.get_guild(guild_id)
+        total_threads = monitored.count(guild_id)
+        embed.add_field(name=f"🏕️ {guild.name if guild else 'Unknown server'} ({guild_id})", value=f"{total_threads} {utils.pluralize('thread', total_threads)}", inline=False)
+    return embed
+
+
 @app_commands.check(lambda interaction: interaction.user.id == USER_ID)
 @bot.tree.command(name="stats", description="Get statistics about the bot.")
 async def server_stats(interaction: discord.Interaction):
-    await interaction.response.defer()
-    guilds = await db.get_servers()
-    total_guild = len(guilds)
-    total_thread = len(await update.get_monitored_posts(bot))
-    
-    embeds = []
-    current_embed = discord.Embed(title="📊 Bot Statistics", color=discord.Color.blue())
-    current_embed.add_field(name=utils.pluralize("Total Server", total_guild), value=total_guild, inline=True)
-    current_embed.add_field(name=utils.pluralize("Total Thread", total_thread), value=total_thread, inline=True)
-    field_count = 2
-    
-    for guild_id in guilds:
-        guild = bot.get_guild(guild_id)
-        if not guild:
-            continue
-        registered_categories = set(await db.get_categories_for_server(guild_id))
-        registered_forums = set(await db.get_forums_for_server(guild_id))
-        registered_threads = set(await db.get_posts_for_server(guild_id))
-        
-        for category_id in registered_categories:
-            category = guild.get_channel(category_id)
-            if category and isinstance(category, discord.CategoryChannel):
-                registered_forums.update(forum.id for forum in category.forums if forum.id not in registered_forums and isinstance(forum, discord.ForumChannel))
-        
-        total_threads = len(registered_threads)
-        for forum_id in registered_forums:
-            forum = guild.get_channel(forum_id)
-            if forum and isinstance(forum, discord.ForumChannel):
-                total_threads += sum(1 for thread in forum.threads if thread not in registered_threads)
-
-        if field_count >= 25:
-            embeds.append(current_embed)
-            current_embed = discord.Embed(title="📊 Bot Statistics", color=discord.Color.blue())
-            field_count = 0
-
-        if total_threads:
-            current_embed.add_field(name=f"🏕️ {guild.name} ({guild_id})", value=f"{total_threads} {utils.pluralize('thread', total_threads)}", inline=False)
-            field_count += 1
-    
-    embeds.append(current_embed)
-
-    if embeds:
-        view = utils.PaginatorView(embeds)
-        await interaction.followup.send(embed=embeds[0], view=view)
-    else:
-        await interaction.followup.send("No data found.")
+    guild_ids = [guild_id for guild_id in tracked.servers() if monitored.count(guild_id)]
+    view = utils.PaginatorView(producer=lambda page: stats_page(guild_ids, page), page_count=stats_page_count(len(guild_ids)))
+    await interaction.response.send_message(embed=stats_page(guild_ids, 0), view=view)
 
 
-def update_on_ready():
+def update_on_ready(full_rescan = False):
     @bot.event
     async def on_ready():
         if bot.ready:
             return
-        bot.ready = True
-        await update.forum_update(bot)
+        await MyBot.on_ready(bot)
+        await update.forum_update(bot, full_rescan)
 
 
-def run(start_init = False):
+def run(start_init = False, full_rescan = False):
     if start_init:
-        update_on_ready()
+        update_on_ready(full_rescan)
     
     token = utils.load_token()
+    bot.launched = time.perf_counter()
     bot.run(token)
 
 
@@ -316,11 +511,11 @@ def run(start_init = False):
 async def permissions_check(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=True)
     guild = interaction.guild
-    tracked = await db.list_channels_for_server(guild.id)
-    if not tracked:
+    tracked_items = tracked.items(guild.id)
+    if not tracked_items:
         return await interaction.followup.send("⚠️ No tracked channels found for this server.", ephemeral=True)
 
-    embeds = await utils.permissions_report(guild, tracked)
+    embeds = await utils.permissions_report(guild, tracked_items)
     if len(embeds) == 1:
         await interaction.followup.send(embed=embeds[0], ephemeral=True)
     else:
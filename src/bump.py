@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import discord
+
+from src import update
+from src.config import BUMP_MARGIN
+from src.ratelimit import limiter, ROUTE_EDIT_THREAD
+from src.timers import TimerHeap
+
+
+ARCHIVE_DURATIONS = (60, 1440, 4320, 10080)
+
+
+def last_activity(thread: discord.Thread) -> float:
+    activity = thread.archive_timestamp.timestamp()
+    if thread.created_at:
+        activity = max(activity, thread.created_at.timestamp())
+    if thread.last_message_id:
+        activity = max(activity, discord.utils.snowflake_time(thread.last_message_id).timestamp())
+    return activity
+
+
+def archive_deadline(thread: discord.Thread, activity: float = None) -> float:
+    if activity is None:
+        activity = last_activity(thread)
+    return activity + thread.auto_archive_duration * 60
+
+
+class ArchiveBumper:
+    def __init__(self, bot: discord.Client, margin: float = BUMP_MARGIN):
+        self.bot = bot
+        self.margin = margin
+        self.timers = TimerHeap()
+        self.bumped = 0
+        self._wakeup = asyncio.Event()
+        self._waiting_for = None
+        self._runner: asyncio.Task | None = None
+        self._bumps: set[asyncio.Task] = set()
+
+    def start(self):
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+
+    def load(self, guilds):
+        for guild in guilds:
+            for thread in guild.threads:
+                self.track(thread)
+
+    def track(self, thread: discord.Thread, activity: float = None):
+        if thread.archived or thread.locked or not update.is_thread_monitored(thread):
+            self.timers.cancel(thread.id)
+            return
+        self.schedule(thread.id, archive_deadline(thread, activity) - self.margin)
+
+    def touch(self, thread_id: int, activity: float, auto_archive_duration: int):
+        if thread_id in self.timers:
+            self.schedule(thread_id, activity + auto_archive_duration * 60 - self.margin)
+
+    def forget(self, thread_id: int):
+        self.timers.cancel(thread_id)
+
+    def schedule(self, thread_id: int, deadline: float):
+        self.timers.schedule(thread_id, deadline)
+        if self._waiting_for is None or deadline < self._waiting_for:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._waiting_for = self.timers.next_deadline()
+            timeout = None if self._waiting_for is None else max(self._waiting_for - time.time(), 0)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            for thread_id in self.timers.pop_due(time.time()):
+                task = asyncio.create_task(self.bump(thread_id))
+                self._bumps.add(task)
+                task.add_done_callback(self._bumps.discard)
+
+    async def bump(self, thread_id: int):
+        thread = self.bot.get_channel(thread_id)
+        if not isinstance(thread, discord.Thread) or thread.archived or not update.is_thread_monitored(thread):
+            return
+
+        duration = thread.auto_archive_duration
+        other = next(d for d in ARCHIVE_DURATIONS if d != duration)
+        try:
+            # Changing the auto-archive duration resets the inactivity timer without posting a message
+            await limiter.acquire(ROUTE_EDIT_THREAD, thread.id)
+            await thread.edit(auto_archive_duration=other)
+            await limiter.acquire(ROUTE_EDIT_THREAD, thread.id)
+            await thread.edit(auto_archive_duration=duration)
+        except (discord.errors.NotFound, discord.errors.Forbidden):
+            return
+        self.bumped += 1
+        self.schedule(thread.id, time.time() + duration * 60 - self.margin)
@@ -0,0 +1,138 @@
+import asyncio
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from src.config import CACHE_DURATION, CACHE_STALE_DURATION, CACHE_MAX_BYTES
+
+
+def _consume_exception(task: asyncio.Task):
+    if not task.cancelled():
+        task.exception()
+
+
+class PackedIdSet:
+    __slots__ = ('_ids',)
+
+    def __init__(self, ids=()):
+        self._ids = array('q', sorted(set(ids)))
+
+    def __contains__(self, item_id) -> bool:
+        i = bisect_left(self._ids, item_id)
+        return i < len(self._ids) and self._ids[i] == item_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self._ids)
+
+
+class MonitoredCache:
+    def __init__(self, ttl: float = CACHE_DURATION, stale_ttl: float = CACHE_STALE_DURATION, max_bytes: int = CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[int, tuple[PackedIdSet, float]] = OrderedDict()
+        self._inflight: dict[int, asyncio.Task] = {}
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_fresh(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry[1] < self.ttl
+
+    def pop(self, key):
+        self._inflight.pop(key, None)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.nbytes -= entry[0].nbytes
+        return entry[0]
+
+    def put(self, key, ids):
+        self._inflight.pop(key, None)
+        self._store(key, PackedIdSet(ids))
+
+    def purge_expired(self) -> int:
+        deadline = time.monotonic() - self.ttl - self.stale_ttl
+        expired = [key for key, (_, timestamp) in self._entries.items() if timestamp < deadline]
+        for key in expired:
+            self.pop(key)
+        self.evictions += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+    async def get(self, key, loader, stale_while_revalidate: bool = False) -> PackedIdSet:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[1]
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            if stale_while_revalidate and age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh(key, loader)
+                return entry[0]
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key, loader))
+
+    def _refresh(self, key, loader) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fill(key, loader))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+        return task
+
+    async def _fill(self, key, loader) -> PackedIdSet:
+        task = asyncio.current_task()
+        try:
+            value = PackedIdSet(await loader())
+            if self._inflight.get(key) is task:
+                self._store(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    def _store(self, key, value: PackedIdSet):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.nbytes -= previous[0].nbytes
+        self._entries[key] = (value, time.monotonic())
+        self.nbytes += value.nbytes
+
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
@@ -8,6 +8,41 @@ SERVER_CHANNEL_ID = 1292842153629974622
 
 USER_ID = 220946643007045632
 
-BATCH_SIZE = 3
+SWEEP_WORKERS = 8
+SWEEP_GUILD_FORUMS = 4  # Forums listed at once per guild
+SWEEP_MODE = "rolling"  # "rolling" spreads guild sweeps over the window, "midnight" sweeps every guild at once
+SWEEP_WINDOW_START = 0
+SWEEP_WINDOW_HOURS = 24
+SWEEP_TICK_MINUTES = 60
+SWEEP_INTERVAL_MIN = 3600
+SWEEP_INTERVAL_MAX = 7 * 86400
+SWEEP_TARGET_UNARCHIVES = 20
+SWEEP_RATE_SMOOTHING = 0.3
+RECONCILE_INTERVAL_HOURS = 6
+JOB_MAX_MANUAL = 4  # Manual updates running at once across all guilds
+JOB_MIN_INTERVAL = 600  # Seconds between two manual updates of a guild
+JOB_PROGRESS_INTERVAL = 5
 ARCHIVED_THREADS_LIMIT = None
-CACHE_DURATION = 3600
\ No newline at end of file
+ARCHIVED_PAGE_SIZE = 100
+
+GLOBAL_RATE_LIMIT = 45
+ROUTE_RATE_LIMITS = {
+    "PATCH /channels/{id}": 10,
+    "GET /channels/{id}": 20,
+    "GET /channels/{id}/threads/archived/public": 20,
+    "GET /guilds/{id}/threads/active": 5,
+}
+CACHE_DURATION = 3600
+CACHE_STALE_WHILE_REVALIDATE = True
+CACHE_STALE_DURATION = 3600
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+CACHE_FILL_CONCURRENCY = 8
+COUNTER_RECONCILE_HOURS = 24  # Full archive scan correcting the monitored-thread counter, None to rely on events and sweeps only
+THREAD_META_FLUSH_SECONDS = 30
+THREAD_META_BATCH = 500  # Pending rows that trigger a flush before the interval
+THREAD_META_LOAD_CHUNK = 1000
+
+DB_POOL_SIZE = 4
+DB_CACHED_STATEMENTS = 256
+
+BUMP_MARGIN = 600
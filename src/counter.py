@@ -0,0 +1,53 @@
+class MonitoredCounter:
+    def __init__(self):
+        self.total = 0
+        self._threads: dict[int, dict[int, int | None]] = {}
+
+    def add(self, guild_id: int, thread_id: int, parent_id: int = None) -> bool:
+        threads = self._threads.setdefault(guild_id, {})
+        if thread_id in threads:
+            if parent_id is not None:
+                threads[thread_id] = parent_id
+            return False
+        threads[thread_id] = parent_id
+        self.total += 1
+        return True
+
+    def discard(self, guild_id: int, thread_id: int) -> bool:
+        threads = self._threads.get(guild_id)
+        if threads is None or thread_id not in threads:
+            return False
+        del threads[thread_id]
+        self.total -= 1
+        return True
+
+    def discard_parent(self, guild_id: int, parent_id: int, keep=()) -> int:
+        threads = self._threads.get(guild_id, {})
+        removed = [thread_id for thread_id, parent in threads.items() if parent == parent_id and thread_id not in keep]
+        for thread_id in removed:
+            del threads[thread_id]
+        self.total -= len(removed)
+        return len(removed)
+
+    def replace(self, guild_id: int, thread_ids):
+        known = self._threads.get(guild_id, {})
+        threads = {thread_id: known.get(thread_id) for thread_id in thread_ids}
+        self.total += len(threads) - len(known)
+        self._threads[guild_id] = threads
+
+    def forget(self, guild_id: int):
+        self.total -= len(self._threads.pop(guild_id, ()))
+
+    def parent_of(self, guild_id: int, thread_id: int) -> int | None:
+        return self._threads.get(guild_id, {}).get(thread_id)
+
+    def ids(self, guild_id: int) -> list[int]:
+        return list(self._threads.get(guild_id, ()))
+
+    def count(self, guild_id: int = None) -> int:
+        if guild_id is not None:
+            return len(self._threads.get(guild_id, ()))
+        return self.total
+
+
+monitored = MonitoredCounter()
@@ -1,98 +1,422 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import aiosqlite
-from src.config import DATABASE
+from src.config import DATABASE, DB_POOL_SIZE, DB_CACHED_STATEMENTS, THREAD_META_LOAD_CHUNK
+from src.registry import tracked
 
 
-async def setup():
-    async with aiosqlite.connect(DATABASE) as db:
-        await db.execute('''CREATE TABLE IF NOT EXISTS servers (
-                            server_id INTEGER PRIMARY KEY)''')
-        await db.execute('''CREATE TABLE IF NOT EXISTS categories (
-                            server_id INTEGER,
-                            category_type TEXT,
-                            item_id INTEGER,
-                            FOREIGN KEY(server_id) REFERENCES servers(server_id))''')
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+)
+
+SNAPSHOT_BATCH_SIZE = 500
+
+CATEGORY_TYPES = {'category': 0, 'forum': 1, 'post': 2}
+CATEGORY_NAMES = {code: name for name, code in CATEGORY_TYPES.items()}
+
+_pool: asyncio.Queue | None = None
+_connections: list[aiosqlite.Connection] = []
+_pool_lock = asyncio.Lock()
+
+
+async def _open_connection() -> aiosqlite.Connection:
+    conn = await aiosqlite.connect(DATABASE, cached_statements=DB_CACHED_STATEMENTS)
+    for pragma in PRAGMAS:
+        await conn.execute(pragma)
+    return conn
+
+
+async def open_pool(size: int = DB_POOL_SIZE):
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            return
+        pool = asyncio.Queue()
+        for _ in range(size):
+            conn = await _open_connection()
+            _connections.append(conn)
+            pool.put_nowait(conn)
+        _pool = pool
+
+
+async def close_pool():
+    global _pool
+    async with _pool_lock:
+        _pool = None
+        while _connections:
+            await _connections.pop().close()
+
+
+@asynccontextmanager
+async def connection():
+    if _pool is None:
+        await open_pool()
+    pool = _pool
+    conn = await pool.get()
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            await conn.rollback()
+        raise
+    finally:
+        pool.put_nowait(conn)
+
+
+async def _migrate_v1(db):
+    await db.execute('''CREATE TABLE IF NOT EXISTS servers (
+                        server_id INTEGER PRIMARY KEY)''')
+    await db.execute('''CREATE TABLE IF NOT EXISTS categories (
+                        server_id INTEGER,
+                        category_type TEXT,
+                        item_id INTEGER,
+                        FOREIGN KEY(server_id) REFERENCES servers(server_id))''')
+
+
+async def _migrate_v2(db):
+    await db.execute('''CREATE TABLE categories_v2 (
+                        server_id INTEGER NOT NULL,
+                        category_type INTEGER NOT NULL,
+                        item_id INTEGER NOT NULL,
+                        PRIMARY KEY (server_id, item_id),
+                        FOREIGN KEY(server_id) REFERENCES servers(server_id)) WITHOUT ROWID''')
+    await db.execute('''INSERT OR IGNORE INTO categories_v2 (server_id, category_type, item_id)
+                        SELECT server_id,
+                               CASE category_type WHEN 'category' THEN 0 WHEN 'forum' THEN 1 WHEN 'post' THEN 2 END,
+                               item_id
+                        FROM categories
+                        WHERE category_type IN ('category', 'forum', 'post')''')
+    await db.execute("DROP TABLE categories")
+    await db.execute("ALTER TABLE categories_v2 RENAME TO categories")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_categories_server_type ON categories (server_id, category_type)")
+
+
+async def _migrate_v3(db):
+    await db.execute('''CREATE TABLE IF NOT EXISTS forum_sweeps (
+                        forum_id INTEGER PRIMARY KEY,
+                        last_archive_ts REAL NOT NULL)''')
+
+
+async def _migrate_v4(db):
+    await db.execute('''CREATE TABLE IF NOT EXISTS forum_activity (
+                        forum_id INTEGER PRIMARY KEY,
+                        last_sweep REAL NOT NULL,
+                        archive_rate REAL NOT NULL,
+                        next_sweep REAL NOT NULL)''')
+
+
+async def _migrate_v5(db):
+    await db.execute('''CREATE TABLE IF NOT EXISTS sweep_checkpoints (
+                        forum_id INTEGER PRIMARY KEY,
+                        cursor_ts REAL NOT NULL,
+                        newest_ts REAL)''')
+    await db.execute('''CREATE TABLE IF NOT EXISTS swept_servers (
+                        server_id INTEGER PRIMARY KEY)''')
+
+
+async def _migrate_v6(db):
+    await db.execute('''CREATE TABLE IF NOT EXISTS bot_settings (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL)''')
+
+
+async def _migrate_v7(db):
+    await db.execute('''CREATE TABLE IF NOT EXISTS thread_meta (
+                        thread_id INTEGER PRIMARY KEY,
+                        guild_id INTEGER NOT NULL,
+                        parent_id INTEGER,
+                        archive_ts REAL NOT NULL,
+                        auto_archive_duration INTEGER NOT NULL,
+                        archived INTEGER NOT NULL,
+                        last_seen REAL NOT NULL)''')
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_thread_meta_guild ON thread_meta(guild_id, last_seen)")
+    await db.execute('''CREATE TABLE IF NOT EXISTS thread_meta_guilds (
+                        guild_id INTEGER PRIMARY KEY,
+                        complete_ts REAL NOT NULL)''')
+
+
+MIGRATIONS = [_migrate_v1, _migrate_v2, _migrate_v3, _migrate_v4, _migrate_v5, _migrate_v6, _migrate_v7]
+
+
+async def migrate(db) -> int:
+    async with db.execute("PRAGMA user_version") as cursor:
+        version = (await cursor.fetchone())[0]
+
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        await db.execute("BEGIN")
+        await migration(db)
+        await db.execute(f"PRAGMA user_version = {target}")
         await db.commit()
+        version = target
 
+    return version
 
-async def add_element(server_id, category_type, item_id):
-    async with aiosqlite.connect(DATABASE) as db:
-        async with db.execute("SELECT 1 FROM categories WHERE server_id = ? AND item_id = ?", (server_id, item_id)) as cursor:
-            exists = await cursor.fetchone()
-            if exists:
-                return False
 
+async def setup():
+    await open_pool()
+    async with connection() as db:
+        await migrate(db)
+    tracked.load(await get_tracked_snapshot())
+
+
+def encode_type(category_type: str) -> int:
+    try:
+        return CATEGORY_TYPES[category_type]
+    except KeyError:
+        raise ValueError(f"Unknown category type: {category_type!r}") from None
+
+
+async def add_element(server_id, category_type, item_id):
+    type_code = encode_type(category_type)
+    async with connection() as db:
         await db.execute("INSERT OR IGNORE INTO servers (server_id) VALUES (?)", (server_id,))
-        await db.execute("INSERT OR IGNORE INTO categories (server_id, category_type, item_id) VALUES (?, ?, ?)", (server_id, category_type, item_id))
+        async with db.execute("INSERT OR IGNORE INTO categories (server_id, category_type, item_id) VALUES (?, ?, ?)", (server_id, type_code, item_id)) as cursor:
+            added = cursor.rowcount > 0
         await db.commit()
-        return True
 
+    tracked.add_server(server_id)
+    if added:
+        tracked.add(server_id, category_type, item_id)
+    return added
 
-async def get_channels(server_id):
-    channels_by_category = {
+
+def empty_channels() -> dict[str, list[int]]:
+    return {
         'category': [],
         'forum': [],
         'post': []
     }
 
-    async with aiosqlite.connect(DATABASE) as db:
+
+async def get_channels(server_id):
+    channels_by_category = empty_channels()
+
+    async with connection() as db:
         async with db.execute("SELECT category_type, item_id FROM categories WHERE server_id = ?", (server_id,)) as cursor:
             async for row in cursor:
-                category_type, item_id = row
-                channels_by_category[category_type].append(item_id)
+                type_code, item_id = row
+                channels_by_category[CATEGORY_NAMES[type_code]].append(item_id)
 
     return channels_by_category
 
 
 async def remove_server(server_id):
-    async with aiosqlite.connect(DATABASE) as db:
+    async with connection() as db:
         await db.execute("DELETE FROM servers WHERE server_id = ?", (server_id,))
         await db.execute("DELETE FROM categories WHERE server_id = ?", (server_id,))
+        await db.execute("DELETE FROM thread_meta WHERE guild_id = ?", (server_id,))
+        await db.execute("DELETE FROM thread_meta_guilds WHERE guild_id = ?", (server_id,))
         await db.commit()
+    tracked.remove_server(server_id)
 
 
 async def remove_channel(server_id, item_id):
-    async with aiosqlite.connect(DATABASE) as db:
+    async with connection() as db:
         await db.execute("DELETE FROM categories WHERE server_id = ? AND item_id = ?", (server_id, item_id))
         await db.commit()
+    tracked.remove(server_id, item_id)
+
+
+async def remove_stale(server_ids, items):
+    async with connection() as db:
+        await db.executemany("DELETE FROM servers WHERE server_id = ?", [(server_id,) for server_id in server_ids])
+        await db.executemany("DELETE FROM categories WHERE server_id = ?", [(server_id,) for server_id in server_ids])
+        await db.executemany("DELETE FROM thread_meta WHERE guild_id = ?", [(server_id,) for server_id in server_ids])
+        await db.executemany("DELETE FROM thread_meta_guilds WHERE guild_id = ?", [(server_id,) for server_id in server_ids])
+        await db.executemany("DELETE FROM categories WHERE server_id = ? AND item_id = ?", items)
+        await db.commit()
+    for server_id in server_ids:
+        tracked.remove_server(server_id)
+    for server_id, item_id in items:
+        tracked.remove(server_id, item_id)
 
 
 async def channel_exists(server_id, item_id):
-    async with aiosqlite.connect(DATABASE) as db:            
-        cursor = await db.execute("SELECT 1 FROM categories WHERE server_id = ? AND item_id = ?", (server_id, item_id))
-        return await cursor.fetchone() is not None
+    async with connection() as db:
+        async with db.execute("SELECT 1 FROM categories WHERE server_id = ? AND item_id = ?", (server_id, item_id)) as cursor:
+            return await cursor.fetchone() is not None
 
 
 async def get_servers():
-    async with aiosqlite.connect(DATABASE) as db:
+    async with connection() as db:
         async with db.execute("SELECT server_id FROM servers") as cursor:
             return [row[0] for row in await cursor.fetchall()]
 
 
 async def get_posts_for_server(server_id):
-    async with aiosqlite.connect(DATABASE) as db:
-        async with db.execute("SELECT item_id FROM categories WHERE server_id = ? AND category_type = 'post'", (server_id,)) as cursor:
+    async with connection() as db:
+        async with db.execute("SELECT item_id FROM categories WHERE server_id = ? AND category_type = ?", (server_id, CATEGORY_TYPES['post'])) as cursor:
             return [row[0] for row in await cursor.fetchall()]
 
 
 async def get_forums_for_server(server_id):
-    async with aiosqlite.connect(DATABASE) as db:
-        async with db.execute("SELECT item_id FROM categories WHERE server_id = ? AND category_type = 'forum'", (server_id,)) as cursor:
+    async with connection() as db:
+        async with db.execute("SELECT item_id FROM categories WHERE server_id = ? AND category_type = ?", (server_id, CATEGORY_TYPES['forum'])) as cursor:
             return [row[0] for row in await cursor.fetchall()]
 
 
 async def get_categories_for_server(server_id):
-    async with aiosqlite.connect(DATABASE) as db:
-        async with db.execute("SELECT item_id FROM categories WHERE server_id = ? AND category_type = 'category'", (server_id,)) as cursor:
+    async with connection() as db:
+        async with db.execute("SELECT item_id FROM categories WHERE server_id = ? AND category_type = ?", (server_id, CATEGORY_TYPES['category'])) as cursor:
             return [row[0] for row in await cursor.fetchall()]
 
 
 async def list_all_channels():
-    async with aiosqlite.connect(DATABASE) as db:
+    async with connection() as db:
         async with db.execute("SELECT item_id, category_type FROM categories") as cursor:
-            return await cursor.fetchall()
+            return [(item_id, CATEGORY_NAMES[type_code]) for item_id, type_code in await cursor.fetchall()]
 
 
 async def list_channels_for_server(server_id: int):
-    async with aiosqlite.connect(DATABASE) as db:
+    async with connection() as db:
         async with db.execute("SELECT item_id, category_type FROM categories WHERE server_id = ?", (server_id,)) as cursor:
-            return await cursor.fetchall()
\ No newline at end of file
+            return [(item_id, CATEGORY_NAMES[type_code]) for item_id, type_code in await cursor.fetchall()]
+
+
+async def get_tracked_snapshot(server_ids=None) -> dict[int, dict[str, list[int]]]:
+    query = "SELECT s.server_id, c.category_type, c.item_id FROM servers s LEFT JOIN categories c ON c.server_id = s.server_id"
+    if server_ids is None:
+        batches = [()]
+    else:
+        server_ids = list(server_ids)
+        batches = [server_ids[i:i + SNAPSHOT_BATCH_SIZE] for i in range(0, len(server_ids), SNAPSHOT_BATCH_SIZE)]
+
+    snapshot = {}
+    async with connection() as db:
+        for batch in batches:
+            batch_query = query
+            if batch:
+                batch_query += f" WHERE s.server_id IN ({', '.join('?' * len(batch))})"
+            async with db.execute(batch_query, batch) as cursor:
+                async for server_id, type_code, item_id in cursor:
+                    channels_by_category = snapshot.setdefault(server_id, empty_channels())
+                    if type_code is not None:
+                        channels_by_category[CATEGORY_NAMES[type_code]].append(item_id)
+
+    return snapshot
+
+
+
+async def get_sweep_marks() -> dict[int, float]:
+    async with connection() as db:
+        async with db.execute("SELECT forum_id, last_archive_ts FROM forum_sweeps") as cursor:
+            return {forum_id: last_archive_ts for forum_id, last_archive_ts in await cursor.fetchall()}
+
+
+async def set_sweep_marks(marks: dict[int, float]):
+    async with connection() as db:
+        await db.executemany('''INSERT INTO forum_sweeps (forum_id, last_archive_ts) VALUES (?, ?)
+                                ON CONFLICT(forum_id) DO UPDATE SET last_archive_ts = excluded.last_archive_ts''', marks.items())
+        await db.commit()
+
+
+async def get_forum_activity() -> dict[int, tuple[float, float, float]]:
+    async with connection() as db:
+        async with db.execute("SELECT forum_id, last_sweep, archive_rate, next_sweep FROM forum_activity") as cursor:
+            return {forum_id: (last_sweep, archive_rate, next_sweep) for forum_id, last_sweep, archive_rate, next_sweep in await cursor.fetchall()}
+
+
+async def set_forum_activity(activity: dict[int, tuple[float, float, float]]):
+    async with connection() as db:
+        await db.executemany('''INSERT OR REPLACE INTO forum_activity (forum_id, last_sweep, archive_rate, next_sweep)
+                                VALUES (?, ?, ?, ?)''', [(forum_id, *values) for forum_id, values in activity.items()])
+        await db.commit()
+
+
+async def get_sweep_checkpoint() -> dict[int, tuple[float, float | None]]:
+    async with connection() as db:
+        async with db.execute("SELECT forum_id, cursor_ts, newest_ts FROM sweep_checkpoints") as cursor:
+            return {forum_id: (cursor_ts, newest_ts) for forum_id, cursor_ts, newest_ts in await cursor.fetchall()}
+
+
+async def save_forum_checkpoint(forum_id: int, cursor_ts: float, newest_ts: float | None):
+    async with connection() as db:
+        await db.execute("INSERT OR REPLACE INTO sweep_checkpoints (forum_id, cursor_ts, newest_ts) VALUES (?, ?, ?)",
+                         (forum_id, cursor_ts, newest_ts))
+        await db.commit()
+
+
+async def finish_forum_sweep(forum_id: int, mark: float | None, activity: tuple[float, float, float]):
+    async with connection() as db:
+        if mark is not None:
+            await db.execute('''INSERT INTO forum_sweeps (forum_id, last_archive_ts) VALUES (?, ?)
+                                ON CONFLICT(forum_id) DO UPDATE SET last_archive_ts = excluded.last_archive_ts''', (forum_id, mark))
+        await db.execute('''INSERT OR REPLACE INTO forum_activity (forum_id, last_sweep, archive_rate, next_sweep)
+                            VALUES (?, ?, ?, ?)''', (forum_id, *activity))
+        await db.execute("DELETE FROM sweep_checkpoints WHERE forum_id = ?", (forum_id,))
+        await db.commit()
+
+
+async def get_swept_servers() -> set[int]:
+    async with connection() as db:
+        async with db.execute("SELECT server_id FROM swept_servers") as cursor:
+            return {server_id for server_id, in await cursor.fetchall()}
+
+
+async def add_swept_server(server_id: int):
+    async with connection() as db:
+        await db.execute("INSERT OR IGNORE INTO swept_servers (server_id) VALUES (?)", (server_id,))
+        await db.commit()
+
+
+async def clear_swept_servers():
+    async with connection() as db:
+        await db.execute("DELETE FROM swept_servers")
+        await db.commit()
+
+
+async def clear_sweep_checkpoint():
+    async with connection() as db:
+        await db.execute("DELETE FROM sweep_checkpoints")
+        await db.execute("DELETE FROM swept_servers")
+        await db.commit()
+
+
+async def get_setting(key: str) -> str | None:
+    async with connection() as db:
+        async with db.execute("SELECT value FROM bot_settings WHERE key = ?", (key,)) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+
+async def set_setting(key: str, value: str):
+    async with connection() as db:
+        await db.execute("INSERT OR REPLACE INTO bot_settings (key, value) VALUES (?, ?)", (key, value))
+        await db.commit()
+
+
+async def write_thread_meta(rows: list[tuple], removed: set[int], complete: dict[int, float]):
+    async with connection() as db:
+        await db.executemany('''INSERT OR REPLACE INTO thread_meta
+                                (thread_id, guild_id, parent_id, archive_ts, auto_archive_duration, archived, last_seen)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)''', rows)
+        await db.executemany("DELETE FROM thread_meta WHERE thread_id = ?", [(thread_id,) for thread_id in removed])
+        # A complete pass over a guild drops the rows it no longer saw
+        await db.executemany("DELETE FROM thread_meta WHERE guild_id = ? AND last_seen < ?", complete.items())
+        await db.executemany("INSERT OR REPLACE INTO thread_meta_guilds (guild_id, complete_ts) VALUES (?, ?)", complete.items())
+        await db.commit()
+
+
+async def get_thread_meta_guilds() -> set[int]:
+    async with connection() as db:
+        async with db.execute("SELECT guild_id FROM thread_meta_guilds") as cursor:
+            return {guild_id for guild_id, in await cursor.fetchall()}
+
+
+async def iter_thread_meta(chunk_size: int = THREAD_META_LOAD_CHUNK):
+    last_id = -1
+    while True:
+        # Each chunk takes its own connection, other queries run between chunks
+        async with connection() as db:
+            async with db.execute('''SELECT thread_id, guild_id, parent_id, archive_ts, auto_archive_duration, archived, last_seen
+                                     FROM thread_meta WHERE thread_id > ? ORDER BY thread_id LIMIT ?''', (last_id, chunk_size)) as cursor:
+                rows = await cursor.fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
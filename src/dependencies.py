@@ -1,13 +1,11 @@
 import subprocess
 import sys
+from importlib import metadata
 
 def get_installed_version(package_name):
     try:
-        output = subprocess.check_output([sys.executable, '-m', 'pip', 'show', package_name], text=True)
-        for line in output.splitlines():
-            if line.startswith('Version:'):
-                return line.split(' ')[-1]  # Return the version number
-    except subprocess.CalledProcessError:
+        return metadata.version(package_name)  # Read from the installed package metadata, no pip subprocess
+    except metadata.PackageNotFoundError:
         return None  # Package is not installed
 
 def check_dependencies(requirements_file='requirements.txt'):
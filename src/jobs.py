@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+from src.config import JOB_MAX_MANUAL, JOB_MIN_INTERVAL
+
+
+class JobRegistry:
+    def __init__(self, max_manual: int = JOB_MAX_MANUAL, min_interval: float = JOB_MIN_INTERVAL):
+        self.max_manual = max_manual
+        self.min_interval = min_interval
+        self._running = {}
+        self._finished: dict[int, float] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def get(self, guild_id: int):
+        return self._running.get(guild_id)
+
+    def add(self, sweep):
+        # A guild that is already registered keeps its sweep, callers coalesce with it
+        return self._running.setdefault(sweep.server_id, sweep)
+
+    def finish(self, sweep):
+        if self._running.get(sweep.server_id) is sweep:
+            del self._running[sweep.server_id]
+            self._finished[sweep.server_id] = time.monotonic()
+        sweep.finished.set()
+
+    def cancel(self, guild_id: int) -> bool:
+        sweep = self._running.get(guild_id)
+        if sweep is None or sweep.cancelled:
+            return False
+        sweep.cancelled = True
+        return True
+
+    def busy(self) -> bool:
+        return sum(sweep.manual for sweep in self._running.values()) >= self.max_manual
+
+    def retry_after(self, guild_id: int) -> float:
+        return max(self._finished.get(guild_id, float('-inf')) + self.min_interval - time.monotonic(), 0.0)
+
+    def spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+jobs = JobRegistry()
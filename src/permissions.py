@@ -0,0 +1,39 @@
+import discord
+
+from src.utils import check_perms
+
+
+SWEEP_PERMISSIONS = ("view_channel", "manage_threads")
+
+
+class PermissionIndex:
+    def __init__(self, required: tuple[str, ...] = SWEEP_PERMISSIONS):
+        self.required = required
+        self.hits = 0
+        self.misses = 0
+        self._by_guild: dict[int, dict[int, tuple[str, ...]]] = {}
+
+    def missing(self, channel: discord.abc.GuildChannel) -> tuple[str, ...]:
+        channels = self._by_guild.setdefault(channel.guild.id, {})
+        missing = channels.get(channel.id)
+        if missing is None:
+            self.misses += 1
+            missing = channels[channel.id] = tuple(p for p in check_perms(channel, set()) if p in self.required)
+        else:
+            self.hits += 1
+        return missing
+
+    def allows(self, channel: discord.abc.GuildChannel) -> bool:
+        return not self.missing(channel)
+
+    def invalidate(self, guild_id: int, channel_id: int = None):
+        if channel_id is None:
+            self._by_guild.pop(guild_id, None)
+        else:
+            self._by_guild.get(guild_id, {}).pop(channel_id, None)
+
+    def clear(self):
+        self._by_guild.clear()
+
+
+permissions = PermissionIndex()
@@ -0,0 +1,39 @@
+import discord
+
+
+THREAD_PARENTS = (discord.ForumChannel, discord.TextChannel)
+
+
+class SweepPlan:
+    def __init__(self, server_id: int):
+        self.server_id = server_id
+        self.forums: dict[int, discord.abc.GuildChannel] = {}
+        self.posts: dict[int, None] = {}
+        self.missing: list[int] = []
+
+    def active_threads(self) -> set[int]:
+        thread_ids = set(self.posts)
+        for forum in self.forums.values():
+            thread_ids.update(thread.id for thread in forum.threads)
+        return thread_ids
+
+
+def plan_server(guild: discord.Guild, channels: dict) -> SweepPlan:
+    plan = SweepPlan(guild.id)
+    for forum_id in channels['forum']:
+        if forum := guild.get_channel(forum_id):
+            plan.forums[forum_id] = forum
+        else:
+            plan.missing.append(forum_id)
+
+    for category_id in channels['category']:
+        category = guild.get_channel(category_id)
+        if category is None:
+            plan.missing.append(category_id)
+            continue
+        for channel in getattr(category, 'channels', ()):
+            if isinstance(channel, THREAD_PARENTS):
+                plan.forums.setdefault(channel.id, channel)  # Forums tracked on their own and through their category are listed once
+
+    plan.posts = dict.fromkeys(channels['post'])
+    return plan
@@ -0,0 +1,117 @@
+import asyncio
+import re
+import time
+from collections import defaultdict
+
+import aiohttp
+
+from src.config import GLOBAL_RATE_LIMIT, ROUTE_RATE_LIMITS
+
+
+ROUTE_EDIT_THREAD = "PATCH /channels/{id}"
+ROUTE_FETCH_CHANNEL = "GET /channels/{id}"
+ROUTE_ARCHIVED_THREADS = "GET /channels/{id}/threads/archived/public"
+ROUTE_ACTIVE_THREADS = "GET /guilds/{id}/threads/active"
+
+SNOWFLAKE = re.compile(r'/(\d{15,21})')
+API_PREFIX = re.compile(r'^/api/v\d+')
+
+
+def parse_route(method: str, path: str) -> tuple[str, int | None]:
+    path = API_PREFIX.sub('', path)
+    ids = SNOWFLAKE.findall(path)
+    return f"{method.upper()} {SNOWFLAKE.sub('/{id}', path)}", int(ids[0]) if ids else None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        self._refill(now)
+        wait = self.blocked_until - now
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return max(wait, 0.0)
+
+    def consume(self):
+        self.tokens -= 1
+
+    def block(self, until: float):
+        self.blocked_until = max(self.blocked_until, until)
+
+
+class RateLimiter:
+    def __init__(self, global_rate: float = GLOBAL_RATE_LIMIT, route_rates: dict = ROUTE_RATE_LIMITS):
+        self.global_bucket = TokenBucket(global_rate)
+        self.route_rates = route_rates
+        self.routes: dict[str, TokenBucket] = {}
+        self.requests = 0
+        self.rate_limited = 0
+        self.throttled = 0.0
+        self.throttled_by_route = defaultdict(float)
+        self._blocked: dict[tuple[str, int], float] = {}
+
+    def route_bucket(self, route: str) -> TokenBucket:
+        if route not in self.routes:
+            self.routes[route] = TokenBucket(self.route_rates.get(route, self.global_bucket.rate))
+        return self.routes[route]
+
+    async def acquire(self, route: str, major: int = None):
+        bucket = self.route_bucket(route)
+        key = (route, major)
+        while True:
+            now = time.monotonic()
+            wait = max(self.global_bucket.delay(now), bucket.delay(now), self._blocked.get(key, 0.0) - now)
+            if wait <= 0:
+                self.global_bucket.consume()
+                bucket.consume()
+                self._blocked.pop(key, None)
+                self.requests += 1
+                return
+            self.throttled += wait
+            self.throttled_by_route[route] += wait
+            await asyncio.sleep(wait)
+
+    def observe(self, route: str, major: int, status: int, headers):
+        now = time.monotonic()
+        if status == 429:
+            self.rate_limited += 1
+            retry_after = float(headers.get('Retry-After', 1))
+            if headers.get('X-RateLimit-Global') == 'true' or headers.get('X-RateLimit-Scope') == 'global':
+                self.global_bucket.block(now + retry_after)
+            else:
+                self._blocked[(route, major)] = now + retry_after
+        elif headers.get('X-RateLimit-Remaining') == '0':
+            self._blocked[(route, major)] = now + float(headers.get('X-RateLimit-Reset-After', 0))
+
+        if len(self._blocked) > 1024:
+            self._blocked = {key: until for key, until in self._blocked.items() if until > now}
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        async def on_request_end(session, context, params):
+            route, major = parse_route(params.method, params.url.path)
+            self.observe(route, major, params.response.status, params.response.headers)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'rate_limited': self.rate_limited,
+            'throttled': self.throttled,
+            'throttled_by_route': dict(self.throttled_by_route),
+        }
+
+
+limiter = RateLimiter()
@@ -0,0 +1,86 @@
+TRACKED_TYPES = ('category', 'forum', 'post')
+
+
+class TrackedRegistry:
+    def __init__(self):
+        self.loaded = False
+        self._items: dict[int, dict[int, str]] = {}
+        self._by_type: dict[int, dict[str, dict[int, None]]] = {}
+
+    def load(self, snapshot: dict[int, dict[str, list[int]]]):
+        self.clear()
+        for server_id, channels_by_category in snapshot.items():
+            self.add_server(server_id)
+            for category_type, item_ids in channels_by_category.items():
+                for item_id in item_ids:
+                    self.add(server_id, category_type, item_id)
+        self.loaded = True
+
+    def clear(self):
+        self._items.clear()
+        self._by_type.clear()
+        self.loaded = False
+
+    def add_server(self, server_id: int):
+        if server_id not in self._items:
+            self._items[server_id] = {}
+            self._by_type[server_id] = {category_type: {} for category_type in TRACKED_TYPES}
+
+    def add(self, server_id: int, category_type: str, item_id: int) -> bool:
+        self.add_server(server_id)
+        if item_id in self._items[server_id]:
+            return False
+        self._items[server_id][item_id] = category_type
+        self._by_type[server_id][category_type][item_id] = None
+        return True
+
+    def remove(self, server_id: int, item_id: int) -> bool:
+        category_type = self._items.get(server_id, {}).pop(item_id, None)
+        if category_type is None:
+            return False
+        del self._by_type[server_id][category_type][item_id]
+        return True
+
+    def remove_server(self, server_id: int):
+        self._items.pop(server_id, None)
+        self._by_type.pop(server_id, None)
+
+    def servers(self) -> list[int]:
+        return list(self._items)
+
+    def server_count(self) -> int:
+        return len(self._items)
+
+    def has_server(self, server_id: int) -> bool:
+        return server_id in self._items
+
+    def exists(self, server_id: int, item_id: int) -> bool:
+        return item_id in self._items.get(server_id, ())
+
+    def type_of(self, server_id: int, item_id: int) -> str | None:
+        return self._items.get(server_id, {}).get(item_id)
+
+    def is_thread_monitored(self, server_id: int, thread_id: int, parent_id: int = None, category_id: int = None) -> bool:
+        by_type = self._by_type.get(server_id)
+        if by_type is None:
+            return False
+        return thread_id in by_type['post'] or parent_id in by_type['forum'] or category_id in by_type['category']
+
+    def channels(self, server_id: int) -> dict[str, list[int]]:
+        by_type = self._by_type.get(server_id)
+        if by_type is None:
+            return {category_type: [] for category_type in TRACKED_TYPES}
+        return {category_type: list(item_ids) for category_type, item_ids in by_type.items()}
+
+    def items(self, server_id: int = None) -> list[tuple[int, str]]:
+        if server_id is not None:
+            return list(self._items.get(server_id, {}).items())
+        return [item for items in self._items.values() for item in items.items()]
+
+    def snapshot(self, server_ids=None) -> dict[int, dict[str, list[int]]]:
+        if server_ids is None:
+            server_ids = self._items
+        return {server_id: self.channels(server_id) for server_id in server_ids if server_id in self._items}
+
+
+tracked = TrackedRegistry()
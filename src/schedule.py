@@ -0,0 +1,19 @@
+import hashlib
+
+from apscheduler.triggers.cron import CronTrigger
+
+from src.config import SWEEP_WINDOW_START, SWEEP_WINDOW_HOURS
+
+
+def sweep_offset(guild_id: int, window_hours: float = SWEEP_WINDOW_HOURS) -> int:
+    digest = hashlib.blake2b(str(guild_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % int(window_hours * 3600)
+
+
+def sweep_trigger(guild_id: int, window_start: int = SWEEP_WINDOW_START, window_hours: float = SWEEP_WINDOW_HOURS) -> CronTrigger:
+    seconds = (window_start * 3600 + sweep_offset(guild_id, window_hours)) % 86400
+    return CronTrigger(hour=seconds // 3600, minute=seconds % 3600 // 60, second=seconds % 60)
+
+
+def sweep_job_id(guild_id: int) -> str:
+    return f"sweep-{guild_id}"
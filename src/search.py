@@ -0,0 +1,123 @@
+from bisect import bisect_left, insort
+
+import discord
+
+
+AUTOCOMPLETE_LIMIT = 25
+
+
+GRAM_SIZE = 3
+
+
+def ngrams(folded: str) -> set[str]:
+    return {folded[i:i + size] for size in range(1, GRAM_SIZE + 1) for i in range(len(folded) - size + 1)}
+
+
+def query_grams(query: str) -> set[str]:
+    if len(query) <= GRAM_SIZE:
+        return {query}
+    return {query[i:i + GRAM_SIZE] for i in range(len(query) - GRAM_SIZE + 1)}
+
+
+class NameSet:
+    def __init__(self):
+        self.names: dict[int, tuple[str, str]] = {}
+        self.ordered: list[tuple[str, int]] = []
+        self.postings: dict[str, set[int]] = {}
+
+    def add(self, item_id: int, name: str):
+        folded = name.casefold()
+        previous = self.names.get(item_id)
+        if previous is not None:
+            if previous[1] == name:
+                return
+            self.remove(item_id)
+        self.names[item_id] = (folded, name)
+        insort(self.ordered, (folded, item_id))
+        for gram in ngrams(folded):
+            self.postings.setdefault(gram, set()).add(item_id)
+
+    def remove(self, item_id: int) -> bool:
+        previous = self.names.pop(item_id, None)
+        if previous is None:
+            return False
+        folded = previous[0]
+        del self.ordered[bisect_left(self.ordered, (folded, item_id))]
+        for gram in ngrams(folded):
+            postings = self.postings[gram]
+            postings.discard(item_id)
+            if not postings:
+                del self.postings[gram]
+        return True
+
+    def search(self, query: str, limit: int = AUTOCOMPLETE_LIMIT) -> list[tuple[int, str]]:
+        query = query.casefold()
+        results = []
+        seen = set()
+
+        # Prefix matches come first, read in name order from the sorted list
+        for i in range(bisect_left(self.ordered, (query, 0)), len(self.ordered)):
+            folded, item_id = self.ordered[i]
+            if len(results) == limit or not folded.startswith(query):
+                break
+            results.append(item_id)
+            seen.add(item_id)
+
+        if len(results) < limit and query:
+            candidates = None
+            for gram in sorted(query_grams(query), key=lambda gram: len(self.postings.get(gram, ()))):
+                postings = self.postings.get(gram, set())
+                candidates = postings if candidates is None else candidates & postings
+                if not candidates:
+                    break
+            matches = []
+            for item_id in candidates:
+                if len(results) + len(matches) == limit:
+                    break
+                if item_id not in seen and query in self.names[item_id][0]:
+                    matches.append(item_id)
+            results.extend(sorted(matches, key=lambda item_id: self.names[item_id][0]))
+
+        return [(item_id, self.names[item_id][1]) for item_id in results]
+
+
+class NameIndex:
+    def __init__(self):
+        self._sets: dict[tuple[int, str], NameSet] = {}
+
+    @staticmethod
+    def kind_of(channel) -> str | None:
+        if isinstance(channel, discord.CategoryChannel):
+            return 'category'
+        if isinstance(channel, discord.ForumChannel):
+            return 'forum'
+        if isinstance(channel, discord.Thread):
+            return 'post'
+        return None
+
+    def load(self, guild: discord.Guild):
+        self.forget(guild.id)
+        for channel in guild.channels:
+            self.add(channel)
+        for thread in guild.threads:
+            self.add(thread)
+
+    def add(self, channel):
+        kind = self.kind_of(channel)
+        if kind is not None:
+            self._sets.setdefault((channel.guild.id, kind), NameSet()).add(channel.id, channel.name)
+
+    def remove(self, guild_id: int, channel_id: int, kind: str = None) -> bool:
+        kinds = (kind,) if kind else ('category', 'forum', 'post')
+        return any(self._sets[guild_id, kind].remove(channel_id) for kind in kinds if (guild_id, kind) in self._sets)
+
+    def forget(self, guild_id: int):
+        for kind in ('category', 'forum', 'post'):
+            self._sets.pop((guild_id, kind), None)
+
+    def search(self, guild_id: int, kind: str, query: str, limit: int = AUTOCOMPLETE_LIMIT) -> list[tuple[int, str]]:
+        names = self._sets.get((guild_id, kind))
+        return names.search(query, limit) if names else []
+
+
+names = NameIndex()
@@ -0,0 +1,27 @@
+import time
+
+
+class StatsAggregator:
+    def __init__(self):
+        self.started = time.time()
+        self.sweeps = 0
+        self.swept_unarchived = 0
+        self.event_unarchived = 0
+        self.skipped_forums = 0
+        self.last_sweep: float | None = None
+
+    def record_sweep(self, sweep):
+        self.sweeps += 1
+        self.swept_unarchived += sweep.unarchived_threads
+        self.skipped_forums += len(sweep.skipped)
+        self.last_sweep = time.time()
+
+    def record_unarchive(self):
+        self.event_unarchived += 1
+
+    @property
+    def unarchived(self) -> int:
+        return self.swept_unarchived + self.event_unarchived
+
+
+stats = StatsAggregator()
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import aiosqlite
+import discord
+
+from src import db
+from src.config import THREAD_META_FLUSH_SECONDS, THREAD_META_BATCH
+
+
+def thread_row(guild_id: int, thread: discord.Thread, last_seen: float = None) -> tuple:
+    return (thread.id, guild_id, thread.parent_id, thread.archive_timestamp.timestamp(), thread.auto_archive_duration,
+            int(thread.archived), time.time() if last_seen is None else last_seen)
+
+
+class ThreadMetaStore:
+    def __init__(self, flush_interval: float = THREAD_META_FLUSH_SECONDS, batch_size: int = THREAD_META_BATCH):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.written = 0
+        self._rows: dict[int, tuple] = {}
+        self._removed: set[int] = set()
+        self._complete: dict[int, float] = {}
+        self._due = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._runner: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._removed)
+
+    def record(self, guild_id: int, thread: discord.Thread):
+        self._removed.discard(thread.id)
+        self._rows[thread.id] = thread_row(guild_id, thread)
+        if len(self._rows) >= self.batch_size:
+            self._due.set()
+
+    def remove(self, thread_id: int):
+        self._rows.pop(thread_id, None)
+        self._removed.add(thread_id)
+
+    def complete(self, guild_id: int, started: float):
+        self._complete[guild_id] = started
+
+    def forget(self, guild_id: int):
+        self._rows = {thread_id: row for thread_id, row in self._rows.items() if row[1] != guild_id}
+        self._complete.pop(guild_id, None)
+
+    async def flush(self) -> int:
+        async with self._lock:
+            rows, removed, complete = self._rows, self._removed, self._complete
+            if not (rows or removed or complete):
+                return 0
+            self._rows, self._removed, self._complete = {}, set(), {}
+            try:
+                await db.write_thread_meta(list(rows.values()), removed, complete)
+            except BaseException:
+                # Keep the batch for the next flush, changes recorded meanwhile win
+                self._rows = rows | self._rows
+                self._removed = (removed - self._rows.keys()) | self._removed
+                self._complete = complete | self._complete
+                raise
+            self.written += len(rows)
+            return len(rows)
+
+    def start(self):
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._due.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._due.clear()
+            try:
+                await self.flush()
+            except aiosqlite.Error as e:
+                print(f"Failed to write thread metadata: {e}")
+
+
+thread_meta = ThreadMetaStore()
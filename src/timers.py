@@ -0,0 +1,50 @@
+import heapq
+
+
+class TimerHeap:
+    def __init__(self):
+        self._heap: list[tuple[float, int]] = []
+        self._deadlines: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key) -> bool:
+        return key in self._deadlines
+
+    def deadline(self, key) -> float | None:
+        return self._deadlines.get(key)
+
+    def schedule(self, key: int, deadline: float):
+        if self._deadlines.get(key) == deadline:
+            return
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        if len(self._heap) > 2 * len(self._deadlines) + 1024:
+            self._compact()
+
+    def cancel(self, key: int) -> bool:
+        return self._deadlines.pop(key, None) is not None
+
+    def next_deadline(self) -> float | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[int]:
+        due = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due.append(key)
+            self._drop_stale()
+        return due
+
+    def _drop_stale(self):
+        # Rescheduled and cancelled timers are left in the heap and skipped lazily
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _compact(self):
+        self._heap = [(deadline, key) for key, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
@@ -1,130 +1,533 @@
 import discord
+import time
 import asyncio
+from collections import deque
+from datetime import datetime, timezone
 
 from src import db
-from src.utils import get_channel
-from src.config import BATCH_SIZE, ARCHIVED_THREADS_LIMIT
+from src.registry import tracked
+from src.plan import plan_server, THREAD_PARENTS
+from src.permissions import permissions
+from src.jobs import jobs
+from src.counter import monitored
+from src.stats import stats
+from src.threadmeta import thread_meta
+from src.ratelimit import limiter, ROUTE_EDIT_THREAD, ROUTE_FETCH_CHANNEL, ROUTE_ARCHIVED_THREADS, ROUTE_ACTIVE_THREADS
+from src.workqueue import WorkQueue
+from src.config import (
+    ARCHIVED_THREADS_LIMIT, ARCHIVED_PAGE_SIZE, SWEEP_GUILD_FORUMS, THREAD_META_LOAD_CHUNK,
+    SWEEP_INTERVAL_MIN, SWEEP_INTERVAL_MAX, SWEEP_TARGET_UNARCHIVES, SWEEP_RATE_SMOOTHING,
+)
 
 
-async def forum_update(bot: discord.Client):
-    server_ids = await db.get_servers()
-    for i in range(0, len(server_ids), BATCH_SIZE):
-        batch = server_ids[i:i + BATCH_SIZE]
-        tasks = [process_server(server_id, bot) for server_id in batch]
-        await asyncio.gather(*tasks)
+MARK_MARGIN = 0.001
 
+sweep_queue = WorkQueue()  # Bounds listing and edit requests across every running sweep
+
+
+def next_interval(archive_rate: float) -> float:
+    if archive_rate <= 0:
+        return SWEEP_INTERVAL_MAX
+    return min(max(SWEEP_TARGET_UNARCHIVES / archive_rate * 86400, SWEEP_INTERVAL_MIN), SWEEP_INTERVAL_MAX)
+
+
+def update_activity(previous: tuple | None, unarchived: int, now: float) -> tuple[float, float, float]:
+    if previous is None:
+        archive_rate = unarchived  # First sweep, assume the backlog built up over a day
+    else:
+        last_sweep, previous_rate, _ = previous
+        observed = unarchived / max((now - last_sweep) / 86400, 1 / 24)
+        archive_rate = SWEEP_RATE_SMOOTHING * observed + (1 - SWEEP_RATE_SMOOTHING) * previous_rate
+    return now, archive_rate, now + next_interval(archive_rate)
+
+
+class ForumProgress:
+    def __init__(self, cursor: float = None, newest: float = None):
+        self.cursor = cursor
+        self.saved_cursor = cursor
+        self.newest = newest
+        self.failed = None
+        self.unarchived = 0
+        self.listed = False
+        self.completed = False
+        self.saved = False
+        self._pages = deque()
+
+    def open_page(self) -> list:
+        page = [None, 0]  # Oldest archive timestamp on the page, edits still running
+        self._pages.append(page)
+        return page
+
+    def settle(self):
+        while self._pages and self._pages[0][1] == 0:
+            oldest, _ = self._pages.popleft()
+            if oldest is not None:
+                self.cursor = oldest
+
+    @property
+    def settled(self) -> bool:
+        return self.listed and not self._pages
+
+
+class ServerSweep:
+    def __init__(self, bot: discord.Client, server_id: int, channels: dict, marks: dict, activity: dict = None,
+                 include_posts: bool = True, checkpoint: dict = None, force: bool = False):
+        self.bot = bot
+        self.server_id = server_id
+        self.channels = channels
+        self.marks = marks
+        self.activity = activity if activity is not None else {}
+        self.include_posts = include_posts
+        self.force = force
+        self.checkpoint = checkpoint if checkpoint is not None else {}
+        self.resumable = False
+        self.queue: WorkQueue | None = None
+        self.jobs = 0
+        self.started = time.time()
+        self.forums: dict[int, ForumProgress] = {}
+        self.already_check = set()
+        self.unarchived_threads = 0
+        self.pending_posts = set()
+        self.posts_resolved = False
+        self.forums_pending = 0
+        self.forums_total = 0
+        self.manual = False
+        self.running = False
+        self.cancelled = False
+        self.idle = asyncio.Event()
+        self.finished = asyncio.Event()
+        self.skipped: dict[int, tuple[str, ...]] = {}
+        self.waiting_forums = deque()
+        self.forums_active = 0
+
+    def submit(self, job, *args):
+        self.jobs += 1
+        self.queue.submit(run_job, self, job, *args)
+
+    def queue_forums(self, forums: list):
+        self.forums_pending += len(forums)
+        self.forums_total += len(forums)
+        self.waiting_forums.extend(forums)
+        self.start_forums()
+
+    def start_forums(self):
+        while self.waiting_forums and self.forums_active < SWEEP_GUILD_FORUMS:
+            forum = self.waiting_forums.popleft()
+            self.forums_active += 1
+            self.submit(sweep_forum_page, forum, self.resume_point(forum.id))
+
+    def claim(self, thread_id: int) -> bool:
+        # Synchronous check-and-add, so concurrent forum pages never claim the same thread twice
+        if thread_id in self.already_check:
+            return False
+        self.already_check.add(thread_id)
+        return True
+
+    def progress(self, forum_id: int) -> ForumProgress:
+        if forum_id not in self.forums:
+            self.forums[forum_id] = ForumProgress(*self.checkpoint.get(forum_id, (None, None)))
+        return self.forums[forum_id]
+
+    def resume_point(self, forum_id: int) -> datetime | None:
+        cursor = self.progress(forum_id).cursor
+        return None if cursor is None else datetime.fromtimestamp(cursor, tz=timezone.utc)
+
+    def see_archive(self, forum_id: int, archived_at: float):
+        progress = self.progress(forum_id)
+        if progress.newest is None or archived_at > progress.newest:
+            progress.newest = archived_at
+
+    def fail_archive(self, forum_id: int, archived_at: float):
+        progress = self.progress(forum_id)
+        if progress.failed is None or archived_at < progress.failed:
+            progress.failed = archived_at
+
+    def finish_forum(self, forum_id: int, completed: bool = True):
+        self.forums_pending -= 1
+        self.forums_active -= 1
+        self.start_forums()
+        progress = self.progress(forum_id)
+        progress.listed = True
+        progress.completed = completed
+        progress.settle()
+
+    def new_mark(self, forum_id: int) -> float | None:
+        progress = self.forums[forum_id]
+        newest = progress.newest
+        if not progress.completed or newest is None:
+            return None
+        if progress.failed is not None:
+            newest = min(newest, progress.failed - MARK_MARGIN)  # Keep failed edits above the mark so they are retried
+        return newest if newest > self.marks.get(forum_id, 0) else None
+
+    @property
+    def new_marks(self) -> dict[int, float]:
+        new_marks = {forum_id: self.new_mark(forum_id) for forum_id in self.forums}
+        return {forum_id: mark for forum_id, mark in new_marks.items() if mark is not None}
+
+    def is_due(self, forum_id: int) -> bool:
+        # Scheduled sweeps (nightly, rolling per guild, the due-forum tick) follow the adaptive schedule, manual ones list every forum
+        if self.force:
+            return True
+        previous = self.activity.get(forum_id)
+        return previous is None or previous[2] <= self.started
+
+    def new_activity(self, forum_id: int) -> tuple[float, float, float]:
+        return update_activity(self.activity.get(forum_id), self.forums[forum_id].unarchived, self.started)
+
+    def take_unresolved_posts(self) -> set[int]:
+        if not self.posts_resolved or self.forums_pending > 0:
+            return set()
+        pending, self.pending_posts = self.pending_posts, set()
+        return pending
+
+
+async def forum_update(bot: discord.Client, full_rescan: bool = False):
+    if full_rescan:
+        await db.clear_sweep_checkpoint()
+    marks, activity, checkpoint = await load_sweep_state(full_rescan)
+    done = await db.get_swept_servers()  # Servers finished before a restart interrupted this sweep
+
+    sweeps = []
+    for server_id, channels in tracked.snapshot().items():
+        if server_id not in done:
+            sweep = ServerSweep(bot, server_id, channels, marks, activity, checkpoint=checkpoint)
+            sweep.resumable = True
+            sweeps.append(sweep)
+    await run_sweeps(sweeps)
+    await db.clear_swept_servers()
+
+
+async def sweep_due_forums(bot: discord.Client):
+    marks, activity, checkpoint = await load_sweep_state()
+    await run_sweeps([
+        ServerSweep(bot, server_id, channels, marks, activity, include_posts=False, checkpoint=checkpoint)
+        for server_id, channels in tracked.snapshot().items()
+    ])
+
+
+async def process_server(server_id: int, bot: discord.Client, channels: dict = None, marks: dict = None, full_rescan: bool = False) -> int:
+    sweep = jobs.get(server_id)
+    if sweep is None:
+        sweep = jobs.add(await new_server_sweep(bot, server_id, channels, marks, full_rescan))
+        await run_sweeps([sweep])
+    await sweep.finished.wait()
+    return sweep.unarchived_threads
+
+
+async def new_server_sweep(bot: discord.Client, server_id: int, channels: dict = None, marks: dict = None, full_rescan: bool = False,
+                           force: bool = False) -> ServerSweep:
+    if channels is None:
+        channels = tracked.channels(server_id)
+    activity = checkpoint = None
+    if full_rescan or marks is None:
+        marks, activity, checkpoint = await load_sweep_state(full_rescan)
+    return ServerSweep(bot, server_id, channels, marks, activity, checkpoint=checkpoint, force=force)
+
+
+async def load_sweep_state(full_rescan: bool = False) -> tuple[dict, dict, dict]:
+    if full_rescan:
+        return {}, {}, {}
+    return await db.get_sweep_marks(), await db.get_forum_activity(), await db.get_sweep_checkpoint()
+
+
+async def run_sweeps(sweeps: list[ServerSweep]):
+    sweeps = [sweep for sweep in map(jobs.add, sweeps) if not sweep.running]  # Guilds already being swept stay with the running sweep
+    try:
+        for sweep in sweeps:
+            sweep.running = True
+            sweep.queue = sweep_queue
+            sweep.submit(sweep_server)
+        await asyncio.gather(*(sweep.idle.wait() for sweep in sweeps))
+    finally:
+        for sweep in sweeps:
+            stats.record_sweep(sweep)
+            jobs.finish(sweep)
+
+
+async def run_job(sweep: ServerSweep, job, *args):
+    try:
+        if not sweep.cancelled:
+            await job(sweep, *args)
+    finally:
+        sweep.jobs -= 1
+        if sweep.jobs == 0:
+            try:
+                if sweep.resumable and not sweep.cancelled:
+                    await db.add_swept_server(sweep.server_id)
+            finally:
+                sweep.idle.set()
 
-async def check_still_exist(server_id: int, bot: discord.Client):
-    guild = bot.get_guild(server_id)
-    if not guild:
-        await db.remove_server(server_id)
-        return
 
-    channels = await db.get_channels(server_id)
-    for channel_id in channels['category'] + channels['forum'] + channels['post']:
-        channel = guild.get_channel(channel_id)
-        if not channel:
-            await db.remove_channel(server_id, channel_id)
+async def save_forum_progress(sweep: ServerSweep, forum_id: int):
+    progress = sweep.forums[forum_id]
+    if progress.settled:
+        if progress.completed and not progress.saved:
+            progress.saved = True
+            await db.finish_forum_sweep(forum_id, sweep.new_mark(forum_id), sweep.new_activity(forum_id))
+    elif progress.cursor != progress.saved_cursor:
+        progress.saved_cursor = progress.cursor
+        await db.save_forum_checkpoint(forum_id, progress.cursor, progress.newest)
 
 
-async def process_server(server_id: int, bot: discord.Client) -> int:
-    already_check = set()
-    unarchived_threads = 0
+async def sweep_server(sweep: ServerSweep):
+    try:
+        guild = sweep.bot.get_guild(sweep.server_id)
+        if guild is None:
+            return  # Left guilds and deleted channels are cleaned up by events and reconcile_tracked
+        plan = plan_server(guild, sweep.channels)
+
+        forums = []
+        for forum_id, forum in plan.forums.items():
+            if missing := permissions.missing(forum):
+                sweep.skipped[forum_id] = missing
+            elif sweep.is_due(forum_id):
+                forums.append(forum)
+        report_skipped(sweep, guild)
+
+        for post_id in plan.posts if sweep.include_posts else ():
+            if not sweep.claim(post_id):
+                continue
+            thread = guild.get_thread(post_id)
+            if thread is None:
+                sweep.pending_posts.add(post_id)
+            elif thread.archived and can_unarchive(sweep, thread):
+                sweep.submit(unarchive_thread, thread)
+
+        sweep.queue_forums(forums)
+        await resolve_active_posts(sweep, guild)
+    finally:
+        sweep.posts_resolved = True
+        submit_unresolved_posts(sweep)
+
+
+async def reconcile_tracked(bot: discord.Client) -> tuple[int, int]:
+    stale_servers = []
+    stale_items = []
+    for server_id, channels in tracked.snapshot().items():
+        guild = bot.get_guild(server_id)
+        if guild is None:
+            stale_servers.append(server_id)
+        elif not guild.unavailable:
+            stale_items.extend((server_id, channel_id) for channel_id in plan_server(guild, channels).missing)
 
-    await check_still_exist(server_id, bot)
+    if stale_servers or stale_items:
+        await db.remove_stale(stale_servers, stale_items)
+    for server_id in stale_servers:
+        monitored.forget(server_id)
+        thread_meta.forget(server_id)
+    return len(stale_servers), len(stale_items)
 
-    posts = await db.get_posts_for_server(server_id)
-    for post_id in posts:
-        if post_id not in already_check:
-            already_check.add(post_id)
-            if await update_post(post_id, bot):
-                unarchived_threads += 1
 
-    forums = await db.get_forums_for_server(server_id)
-    for forum_id in forums:
-        channel = bot.get_channel(forum_id)
-        if channel:
-            unarchived_threads += await update_forum(channel, bot, already_check)
+def can_unarchive(sweep: ServerSweep, thread: discord.Thread) -> bool:
+    if thread.parent_id in sweep.skipped:
+        return False
+    return thread.parent is None or permissions.allows(thread.parent)
 
-    categories = await db.get_categories_for_server(server_id)
-    for category_id in categories:
-        channel = bot.get_channel(category_id)
-        if channel:
-            unarchived_threads += await update_category(channel, bot, already_check)
 
-    return unarchived_threads
+def report_skipped(sweep: ServerSweep, guild: discord.Guild):
+    if sweep.skipped:
+        print(f"Skipping {len(sweep.skipped)} forums in {guild.name} ({guild.id}) with missing permissions: "
+              + ", ".join(f"{forum_id} ({', '.join(missing)})" for forum_id, missing in sweep.skipped.items()))
 
 
-async def update_category(category: discord.CategoryChannel, bot: discord.Client, already_check: set) -> int:
-    count = 0
-    for channel in category.channels:
-        if isinstance(channel, discord.ForumChannel):
-            count += await update_forum(channel, bot, already_check)
-    return count
+async def resolve_active_posts(sweep: ServerSweep, guild: discord.Guild):
+    if not sweep.pending_posts:
+        return
+    await limiter.acquire(ROUTE_ACTIVE_THREADS, guild.id)
+    try:
+        active_threads = await guild.active_threads()
+    except discord.HTTPException:
+        return  # Unresolved posts fall back to per-thread fetches
+    for thread in active_threads:
+        sweep.pending_posts.discard(thread.id)
+
 
+def submit_unresolved_posts(sweep: ServerSweep):
+    for post_id in sweep.take_unresolved_posts():
+        sweep.submit(sweep_post, post_id)
 
-async def update_forum(forum: discord.ForumChannel, bot: discord.Client, already_check: set) -> int:
-    count = 0
+
+async def sweep_post(sweep: ServerSweep, post_id: int):
+    await limiter.acquire(ROUTE_FETCH_CHANNEL, post_id)
     try:
-        async for thread in forum.archived_threads(limit=ARCHIVED_THREADS_LIMIT):
-            if thread.id not in already_check:
-                already_check.add(thread.id)
-                if thread.archived:
-                    try:
-                        await thread.edit(archived=False)
-                        count += 1
-                    except (discord.errors.NotFound, discord.errors.Forbidden):
-                        pass
+        thread = await sweep.bot.fetch_channel(post_id)
+    except discord.errors.NotFound:
+        await db.remove_channel(sweep.server_id, post_id)
+        monitored.discard(sweep.server_id, post_id)
+        thread_meta.remove(post_id)
+        return
     except discord.errors.Forbidden:
-        pass
-    return count
+        return
+    thread_meta.record(sweep.server_id, thread)
+    if thread.archived and can_unarchive(sweep, thread) and await unarchive(thread):
+        sweep.unarchived_threads += 1
 
 
-async def update_post(thread_id: int, bot: discord.Client) -> bool:
+async def sweep_forum_page(sweep: ServerSweep, forum: discord.ForumChannel, before: datetime = None):
+    has_next_page = False
+    completed = False
     try:
-        thread = await bot.fetch_channel(thread_id)
-        if thread.archived:
-            await thread.edit(archived=False)
-            return True
+        since = sweep.marks.get(forum.id)
+        await limiter.acquire(ROUTE_ARCHIVED_THREADS, forum.id)
+        try:
+            threads = [thread async for thread in forum.archived_threads(limit=ARCHIVED_PAGE_SIZE, before=before)]
+        except discord.HTTPException:
+            return
+
+        page = sweep.progress(forum.id).open_page()
+        for thread in threads:
+            archived_at = thread.archive_timestamp.timestamp()
+            if since is not None and archived_at <= since:
+                break  # Archives are listed newest first, everything older was handled by a previous sweep
+            sweep.see_archive(forum.id, archived_at)
+            monitored.add(sweep.server_id, thread.id, forum.id)
+            thread_meta.record(sweep.server_id, thread)
+            page[0] = archived_at
+            if thread.id in sweep.pending_posts:
+                sweep.pending_posts.discard(thread.id)
+            elif not sweep.claim(thread.id) or not thread.archived:
+                continue
+            page[1] += 1
+            sweep.submit(unarchive_thread, thread, forum.id, page)
+        else:
+            has_next_page = len(threads) == ARCHIVED_PAGE_SIZE
+
+        if has_next_page:
+            sweep.submit(sweep_forum_page, forum, threads[-1].archive_timestamp)
+        completed = True
+    finally:
+        if has_next_page:
+            sweep.progress(forum.id).settle()
+        else:
+            sweep.finish_forum(forum.id, completed)
+            submit_unresolved_posts(sweep)
+        await save_forum_progress(sweep, forum.id)
+
+
+async def unarchive_thread(sweep: ServerSweep, thread: discord.Thread, forum_id: int = None, page: list = None):
+    unarchived = False
+    try:
+        unarchived = await unarchive(thread)
+    finally:
+        if unarchived:
+            sweep.unarchived_threads += 1
+            if forum_id is not None:
+                sweep.progress(forum_id).unarchived += 1
+        elif forum_id is not None:
+            sweep.fail_archive(forum_id, thread.archive_timestamp.timestamp())
+        if page is not None:
+            page[1] -= 1
+            sweep.progress(forum_id).settle()
+            await save_forum_progress(sweep, forum_id)
+
+
+async def unarchive(thread: discord.Thread) -> bool:
+    await limiter.acquire(ROUTE_EDIT_THREAD, thread.id)
+    try:
+        await thread.edit(archived=False)
+        return True
     except (discord.errors.NotFound, discord.errors.Forbidden):
-        pass
-    return False
+        return False
+
+
+def is_thread_monitored(thread: discord.Thread) -> bool:
+    parent = thread.parent
+    category_id = parent.category_id if parent else None
+    return tracked.is_thread_monitored(thread.guild.id, thread.id, thread.parent_id, category_id)
+
+
+def seed_monitored(guilds):
+    for guild in guilds:
+        for post_id in tracked.channels(guild.id)['post']:
+            monitored.add(guild.id, post_id)
+        for thread in guild.threads:
+            if is_thread_monitored(thread):
+                monitored.add(guild.id, thread.id, thread.parent_id)
 
 
 async def get_monitored_posts(bot: discord.Client, guild_id: int = None) -> set:
     post_set = set()
-    if guild_id:
-        channels = await db.list_channels_for_server(guild_id)
-    else:
-        channels = await db.list_all_channels()
-    
-    for item_id, category_type in channels:
-        channel = await get_channel(item_id, bot)
-        
-        if not channel:
+    for server_id, channels in tracked.snapshot(None if guild_id is None else [guild_id]).items():
+        guild = bot.get_guild(server_id)
+        if not guild:
             continue
-        
-        if category_type == 'forum':
-            for thread in channel.threads:
-                post_set.add(thread.id)
-            try:
-                async for thread in channel.archived_threads(limit=ARCHIVED_THREADS_LIMIT):
-                    post_set.add(thread.id)
-            except discord.errors.Forbidden:
-                pass
-
-        elif category_type == 'category':
-            for forum in channel.channels:
-                if isinstance(forum, (discord.ForumChannel, discord.TextChannel)):
-                    for thread in forum.threads:
-                        post_set.add(thread.id)
-                    try:
-                        async for thread in forum.archived_threads(limit=ARCHIVED_THREADS_LIMIT):
-                            post_set.add(thread.id)
-                    except discord.errors.Forbidden:
-                        pass
-
-        elif category_type == 'post':
-            post_set.add(item_id)
-
-    return post_set
\ No newline at end of file
+
+        started = time.time()
+        plan = plan_server(guild, channels)
+        post_set.update(plan.posts)
+        for forum in plan.forums.values():
+            post_set.update(await list_threads(server_id, forum))
+        thread_meta.complete(server_id, started)
+
+    return post_set
+
+
+async def list_threads(guild_id: int, channel: discord.abc.GuildChannel) -> set[int]:
+    thread_ids = set()
+    for thread in channel.threads:
+        thread_ids.add(thread.id)
+        thread_meta.record(guild_id, thread)
+    try:
+        async for thread in channel.archived_threads(limit=ARCHIVED_THREADS_LIMIT):
+            thread_ids.add(thread.id)
+            thread_meta.record(guild_id, thread)
+    except discord.errors.Forbidden:
+        pass
+    return thread_ids
+
+
+def thread_parents(channel) -> list:
+    if isinstance(channel, THREAD_PARENTS):
+        return [channel]
+    return [child for child in getattr(channel, 'channels', ()) if isinstance(child, THREAD_PARENTS)]
+
+
+async def add_monitored_channel(guild: discord.Guild, channel_id: int) -> int:
+    # Lists only the added channel, the full archive scan stays with the counter reconcile
+    if tracked.type_of(guild.id, channel_id) == 'post':
+        return int(monitored.add(guild.id, channel_id))
+    added = 0
+    for parent in thread_parents(guild.get_channel(channel_id)):
+        for thread_id in await list_threads(guild.id, parent):
+            added += monitored.add(guild.id, thread_id, parent.id)
+    return added
+
+
+def remove_monitored_channel(guild: discord.Guild, channel_id: int, channel_type: str) -> int:
+    # Threads still covered by another tracked channel stay counted
+    guild_id = guild.id
+    if channel_type == 'post':
+        parent_id = monitored.parent_of(guild_id, channel_id)
+        parent = guild.get_channel(parent_id) if parent_id else None
+        if tracked.is_thread_monitored(guild_id, channel_id, parent_id, parent.category_id if parent else None):
+            return 0
+        thread_meta.remove(channel_id)
+        return int(monitored.discard(guild_id, channel_id))
+
+    posts = tracked.channels(guild_id)['post']
+    channel = guild.get_channel(channel_id)
+    if channel is None:
+        return monitored.discard_parent(guild_id, channel_id, keep=posts)
+    return sum(monitored.discard_parent(guild_id, parent.id, keep=posts) for parent in thread_parents(channel)
+               if not tracked.is_thread_monitored(guild_id, None, parent.id, parent.category_id))
+
+
+async def load_thread_meta(bot: discord.Client, chunk_size: int = THREAD_META_LOAD_CHUNK) -> set[int]:
+    complete = await db.get_thread_meta_guilds()
+    async for rows in db.iter_thread_meta(chunk_size):
+        for thread_id, guild_id, parent_id, _, _, _, _ in rows:
+            guild = bot.get_guild(guild_id)
+            parent = guild.get_channel(parent_id) if guild else None
+            category_id = parent.category_id if parent else None
+            if guild is None or not tracked.is_thread_monitored(guild_id, thread_id, parent_id, category_id):
+                thread_meta.remove(thread_id)
+                continue
+            monitored.add(guild_id, thread_id, parent_id)
+        await asyncio.sleep(0)  # Let gateway events through between chunks
+
+    # Guilds with a complete pass on record start with a warm monitored-post cache
+    complete = {guild_id for guild_id in complete if bot.get_guild(guild_id) and tracked.has_server(guild_id)}
+    for guild_id in complete:
+        bot.monitored_cache.put(guild_id, monitored.ids(guild_id))
+    return complete
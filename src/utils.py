@@ -1,5 +1,7 @@
 import os
 import re
+import json
+import hashlib
 import discord
 from src.config import TOKEN_FILE, PERMISSIONS_TO_CHECK
 
@@ -58,14 +60,25 @@ def time_format(total_time: int) -> str:
         return f"{total_time:.2f}h"
 
 
+def size_format(total_bytes: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if total_bytes < 1024:
+            return f"{total_bytes:.0f}{unit}" if unit == "B" else f"{total_bytes:.2f}{unit}"
+        total_bytes = total_bytes / 1024
+    return f"{total_bytes:.2f}GB"
+
+
 def pluralize(word: str, count: int) -> str:
     return f"{word}{'s' if count > 1 else ''}"
 
 
 class PaginatorView(discord.ui.View):
-    def __init__(self, embeds: list[discord.Embed], timeout: int = 180):
+    def __init__(self, embeds: list[discord.Embed] = None, timeout: int = 180, producer=None, page_count: int = None):
         super().__init__(timeout=timeout)
-        self.embeds = embeds
+        if producer is None:
+            producer, page_count = embeds.__getitem__, len(embeds)
+        self.producer = producer
+        self.page_count = page_count
         self.current_page = 0
         self.update_buttons()
 
@@ -81,11 +94,17 @@ class PaginatorView(discord.ui.View):
 
     def update_buttons(self):
         self.previous_button.disabled = self.current_page == 0
-        self.next_button.disabled = self.current_page == len(self.embeds) - 1
+        self.next_button.disabled = self.current_page >= self.page_count - 1
 
     async def update_embed(self, interaction: discord.Interaction):
         self.update_buttons()
-        await interaction.response.edit_message(embed=self.embeds[self.current_page], view=self)
+        await interaction.response.edit_message(embed=self.producer(self.current_page), view=self)
+
+
+def command_hash(tree: discord.app_commands.CommandTree) -> str:
+    # Same payloads the tree uploads on sync, ordered so the hash only changes with the definitions
+    commands = sorted((command.to_dict(tree) for command in tree.get_commands()), key=lambda command: (command['type'], command['name']))
+    return hashlib.sha256(json.dumps(commands, sort_keys=True).encode()).hexdigest()
 
 
 def check_perms(channel: discord.abc.GuildChannel, inherited: set[str]) -> list[str]:
@@ -0,0 +1,53 @@
+import asyncio
+import traceback
+
+from src.config import SWEEP_WORKERS
+
+
+class WorkQueue:
+    def __init__(self, workers: int = SWEEP_WORKERS):
+        self.workers = workers
+        self.completed = 0
+        self.failed = 0
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._loop = None
+
+    def start(self):
+        # Workers live as long as the event loop, every submitter shares them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, job, *args):
+        self.start()
+        self._queue.put_nowait((job, args))
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _worker(self):
+        while True:
+            job, args = await self._queue.get()
+            try:
+                await job(*args)
+                self.completed += 1
+            except Exception:
+                self.failed += 1
+                print(f"Job {job.__name__} failed:")
+                traceback.print_exc()
+            finally:
+                self._queue.task_done()
+
+    async def join(self):
+        self.start()
+        await self._queue.join()
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = self._queue = None
@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+
+from src.cache import MonitoredCache, PackedIdSet
+
+
+class TestPackedIdSet(unittest.TestCase):
+
+    def test_membership(self):
+        ids = PackedIdSet([1290278519041036288, 5, 5, 3])
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(list(ids), [3, 5, 1290278519041036288])
+        self.assertIn(1290278519041036288, ids)
+        self.assertNotIn(4, ids)
+        self.assertNotIn(2 ** 62, ids)
+        self.assertNotIn(1, PackedIdSet())
+
+
+class TestMonitoredCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_fills_are_deduplicated(self):
+        cache = MonitoredCache(ttl=60)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {1, 2, 3}
+
+        results = await asyncio.gather(*(cache.get(42, loader) for _ in range(10)))
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(set(result) == {1, 2, 3} for result in results))
+
+        # Fresh entries are served without calling the loader again
+        await cache.get(42, loader)
+        self.assertEqual(calls, 1)
+
+    async def test_stale_while_revalidate(self):
+        cache = MonitoredCache(ttl=0, stale_ttl=60)
+        refreshed = asyncio.Event()
+
+        async def first_loader():
+            return {1}
+
+        async def second_loader():
+            refreshed.set()
+            return {1, 2}
+
+        self.assertEqual(set(await cache.get(42, first_loader)), {1})
+        self.assertEqual(set(await cache.get(42, second_loader, stale_while_revalidate=True)), {1})  # Old value while refreshing
+        await asyncio.wait_for(refreshed.wait(), 1)
+        await asyncio.sleep(0)
+        self.assertEqual(set(await cache.get(42, first_loader, stale_while_revalidate=True)), {1, 2})
+
+    async def test_failed_fill_is_not_cached(self):
+        cache = MonitoredCache(ttl=60)
+
+        async def failing_loader():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            await cache.get(42, failing_loader)
+        self.assertNotIn(42, cache)
+
+    async def test_pop_discards_inflight_fill(self):
+        cache = MonitoredCache(ttl=60)
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            return {1}
+
+        fill = asyncio.create_task(cache.get(42, loader))
+        await asyncio.sleep(0)
+        cache.pop(42)
+        self.assertEqual(set(await fill), {1})
+        self.assertNotIn(42, cache)
+
+    async def test_memory_budget_evicts_least_recently_used(self):
+        entry_size = PackedIdSet(range(100)).nbytes
+        cache = MonitoredCache(ttl=60, max_bytes=entry_size * 2)
+
+        async def loader():
+            return range(100)
+
+        await cache.get(1, loader)
+        await cache.get(2, loader)
+        await cache.get(1, loader)  # 2 becomes the least recently used entry
+        await cache.get(3, loader)
+
+        self.assertIn(1, cache)
+        self.assertNotIn(2, cache)
+        self.assertIn(3, cache)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 3)
+        self.assertEqual(stats['hit_rate'], 0.25)
+
+    async def test_purge_expired(self):
+        cache = MonitoredCache(ttl=0, stale_ttl=0)
+
+        async def loader():
+            return {1}
+
+        await cache.get(42, loader)
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertNotIn(42, cache)
+        self.assertEqual(cache.nbytes, 0)
@@ -0,0 +1,52 @@
+import unittest
+
+from src.counter import MonitoredCounter
+
+
+class TestMonitoredCounter(unittest.TestCase):
+
+    def test_add_and_discard(self):
+        counter = MonitoredCounter()
+
+        self.assertTrue(counter.add(1, 10, 100))
+        self.assertFalse(counter.add(1, 10))  # Already counted
+        self.assertTrue(counter.add(2, 20))
+        self.assertEqual(counter.count(), 2)
+        self.assertEqual(counter.count(1), 1)
+
+        self.assertTrue(counter.discard(1, 10))
+        self.assertFalse(counter.discard(1, 10))
+        self.assertFalse(counter.discard(3, 30))
+        self.assertEqual(counter.count(), 1)
+
+    def test_discard_parent_keeps_tracked_posts(self):
+        counter = MonitoredCounter()
+        counter.add(1, 10, 100)
+        counter.add(1, 11, 100)
+        counter.add(1, 12, 200)
+
+        self.assertEqual(counter.discard_parent(1, 100, keep=[11]), 1)
+        self.assertEqual(counter.count(1), 2)
+
+    def test_replace_and_forget(self):
+        counter = MonitoredCounter()
+        counter.add(1, 10)
+
+        counter.add(1, 11, 100)
+        counter.replace(1, [11, 12])
+        self.assertEqual(counter.count(1), 2)
+        self.assertEqual(counter.discard_parent(1, 100), 1)  # Known parents survive a reconciliation
+
+        counter.add(2, 20)
+        counter.forget(1)
+        self.assertEqual(counter.count(), 1)
+
+    def test_total_matches_guild_counts(self):
+        counter = MonitoredCounter()
+        for thread_id in range(10):
+            counter.add(thread_id % 3, thread_id, 100 + thread_id % 2)
+        counter.discard(0, 3)
+        counter.discard_parent(1, 101)
+        counter.replace(2, [2, 5, 50, 51])
+
+        self.assertEqual(counter.total, sum(counter.count(guild_id) for guild_id in range(3)))
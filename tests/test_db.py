@@ -2,6 +2,8 @@ import asyncio
 import unittest
 import aiosqlite
 
+from src.config import DB_POOL_SIZE
+from src.registry import tracked
 from src.db import (
     add_element,
     setup,
@@ -9,10 +11,35 @@ from src.db import (
     channel_exists,
     get_channels,
     get_servers,
+    get_tracked_snapshot,
+    get_sweep_marks,
+    set_sweep_marks,
+    get_forum_activity,
+    set_forum_activity,
+    get_sweep_checkpoint,
+    save_forum_checkpoint,
+    finish_forum_sweep,
+    get_swept_servers,
+    add_swept_server,
+    clear_swept_servers,
+    get_setting,
+    set_setting,
+    write_thread_meta,
+    get_thread_meta_guilds,
+    iter_thread_meta,
     remove_server,
+    remove_stale,
+    close_pool,
+    connection,
+    migrate,
+    MIGRATIONS,
     DATABASE
 )
 
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
 class TestDatabase(unittest.TestCase):
 
     @classmethod
@@ -29,8 +56,17 @@ class TestDatabase(unittest.TestCase):
             async with aiosqlite.connect(DATABASE) as conn:
                 await conn.execute("DROP TABLE IF EXISTS servers")
                 await conn.execute("DROP TABLE IF EXISTS categories")
+                await conn.execute("DROP TABLE IF EXISTS forum_sweeps")
+                await conn.execute("DROP TABLE IF EXISTS forum_activity")
+                await conn.execute("DROP TABLE IF EXISTS sweep_checkpoints")
+                await conn.execute("DROP TABLE IF EXISTS swept_servers")
+                await conn.execute("DROP TABLE IF EXISTS bot_settings")
+                await conn.execute("DROP TABLE IF EXISTS thread_meta")
+                await conn.execute("DROP TABLE IF EXISTS thread_meta_guilds")
+                await conn.execute("PRAGMA user_version = 0")
                 await conn.commit()
         
+        cls.loop.run_until_complete(close_pool())
         cls.loop.run_until_complete(cleanup())
 
     def test_add_element(self):
@@ -94,11 +130,164 @@ class TestDatabase(unittest.TestCase):
     def test_remove_server(self):
         server_id = 123456
         # Add the server to the database
-        self.loop.run_until_complete(add_element(server_id, 'dummy', 0))
+        self.loop.run_until_complete(add_element(server_id, 'post', 0))
         servers = self.loop.run_until_complete(get_servers())
         self.assertIn(server_id, servers)
 
         # Remove the server
         self.loop.run_until_complete(remove_server(server_id))
         servers = self.loop.run_until_complete(get_servers())
-        self.assertNotIn(server_id, servers)
\ No newline at end of file
+        self.assertNotIn(server_id, servers)
+
+    def test_pool_reuses_connections(self):
+        async def journal_modes():
+            modes = []
+            for _ in range(DB_POOL_SIZE * 3):
+                async with connection() as conn:
+                    async with conn.execute("PRAGMA journal_mode") as cursor:
+                        modes.append((id(conn), (await cursor.fetchone())[0]))
+            return modes
+
+        modes = self.loop.run_until_complete(journal_modes())
+        self.assertTrue(all(mode == 'wal' for _, mode in modes))
+        self.assertEqual(len({conn_id for conn_id, _ in modes}), DB_POOL_SIZE)  # Only pooled connections are handed out
+
+    def test_get_tracked_snapshot(self):
+        server_a = 654321
+        server_b = 654322
+
+        self.loop.run_until_complete(add_element(server_a, 'category', 10))
+        self.loop.run_until_complete(add_element(server_a, 'post', 11))
+        self.loop.run_until_complete(add_element(server_b, 'forum', 12))
+
+        # Full snapshot groups every tracked row by server and type
+        snapshot = self.loop.run_until_complete(get_tracked_snapshot())
+        self.assertEqual(snapshot[server_a]['category'], [10])
+        self.assertEqual(snapshot[server_a]['post'], [11])
+        self.assertEqual(snapshot[server_b]['forum'], [12])
+
+        # Restricting to a batch only returns the requested servers
+        snapshot = self.loop.run_until_complete(get_tracked_snapshot([server_b]))
+        self.assertEqual(list(snapshot), [server_b])
+
+        # Servers without tracked items are still listed
+        self.loop.run_until_complete(remove_channel(server_b, 12))
+        snapshot = self.loop.run_until_complete(get_tracked_snapshot([server_b]))
+        self.assertEqual(snapshot[server_b], {'category': [], 'forum': [], 'post': []})
+
+    def test_add_element_unknown_type(self):
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(add_element(123456, 'dummy', 20))
+
+    def test_migrate_legacy_schema(self):
+        async def run_migration():
+            async with aiosqlite.connect(':memory:') as conn:
+                # Schema and data as created before versioned migrations existed
+                await conn.execute("CREATE TABLE servers (server_id INTEGER PRIMARY KEY)")
+                await conn.execute("CREATE TABLE categories (server_id INTEGER, category_type TEXT, item_id INTEGER)")
+                await conn.executemany("INSERT INTO categories VALUES (?, ?, ?)", [
+                    (1, 'forum', 100),
+                    (1, 'forum', 100),
+                    (1, 'post', 101),
+                    (2, 'category', 200),
+                ])
+                await conn.commit()
+
+                version = await migrate(conn)
+                async with conn.execute("SELECT server_id, category_type, item_id FROM categories ORDER BY item_id") as cursor:
+                    rows = await cursor.fetchall()
+                async with conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'categories'") as cursor:
+                    indexes = [row[0] for row in await cursor.fetchall()]
+                return version, rows, indexes
+
+        version, rows, indexes = self.loop.run_until_complete(run_migration())
+        self.assertEqual(version, len(MIGRATIONS))
+        self.assertEqual(rows, [(1, 1, 100), (1, 2, 101), (2, 0, 200)])  # Duplicates dropped, types encoded
+        self.assertIn('idx_categories_server_type', indexes)
+
+    def test_registry_write_through(self):
+        server_id = 123457
+
+        self.loop.run_until_complete(add_element(server_id, 'forum', 30))
+        self.assertEqual(tracked.type_of(server_id, 30), 'forum')
+
+        self.loop.run_until_complete(remove_channel(server_id, 30))
+        self.assertFalse(tracked.exists(server_id, 30))
+
+        self.loop.run_until_complete(add_element(server_id, 'post', 31))
+        self.loop.run_until_complete(remove_server(server_id))
+        self.assertNotIn(server_id, tracked.servers())
+
+    def test_remove_stale(self):
+        self.loop.run_until_complete(add_element(123458, 'forum', 32))
+        self.loop.run_until_complete(add_element(123458, 'post', 33))
+        self.loop.run_until_complete(add_element(123459, 'category', 34))
+
+        self.loop.run_until_complete(write_thread_meta([(950, 123459, 34, 100.0, 1440, 1, 100.0)], set(), {123459: 0.0}))
+
+        self.loop.run_until_complete(remove_stale([123459], [(123458, 32)]))
+
+        self.assertEqual(self.loop.run_until_complete(get_tracked_snapshot([123458, 123459])),
+                         {123458: {'category': [], 'forum': [], 'post': [33]}})
+        self.assertEqual(tracked.items(123458), [(33, 'post')])
+        self.assertFalse(tracked.has_server(123459))
+        self.assertNotIn(123459, self.loop.run_until_complete(get_thread_meta_guilds()))
+        self.assertEqual([row for chunk in self.loop.run_until_complete(collect(iter_thread_meta())) for row in chunk if row[1] == 123459], [])
+
+    def test_sweep_marks(self):
+        self.loop.run_until_complete(set_sweep_marks({40: 1700000000.0, 41: 1700000100.5}))
+        self.loop.run_until_complete(set_sweep_marks({40: 1700000200.0}))
+
+        marks = self.loop.run_until_complete(get_sweep_marks())
+        self.assertEqual(marks[40], 1700000200.0)  # Newer mark replaces the old one
+        self.assertEqual(marks[41], 1700000100.5)
+
+    def test_forum_activity(self):
+        self.loop.run_until_complete(set_forum_activity({50: (100.0, 2.5, 3700.0)}))
+        self.loop.run_until_complete(set_forum_activity({50: (200.0, 3.0, 3800.0), 51: (200.0, 0.0, 9000.0)}))
+
+        activity = self.loop.run_until_complete(get_forum_activity())
+        self.assertEqual(activity[50], (200.0, 3.0, 3800.0))
+        self.assertEqual(activity[51], (200.0, 0.0, 9000.0))
+
+    def test_sweep_checkpoint(self):
+        self.loop.run_until_complete(save_forum_checkpoint(60, 500.0, 900.0))
+        self.loop.run_until_complete(save_forum_checkpoint(61, 400.0, None))
+        self.loop.run_until_complete(save_forum_checkpoint(60, 300.0, 900.0))
+        self.assertEqual(self.loop.run_until_complete(get_sweep_checkpoint())[60], (300.0, 900.0))
+
+        # Finishing a forum records its mark and drops the checkpoint in one transaction
+        self.loop.run_until_complete(finish_forum_sweep(60, 900.0, (1000.0, 1.0, 5000.0)))
+        checkpoint = self.loop.run_until_complete(get_sweep_checkpoint())
+        self.assertNotIn(60, checkpoint)
+        self.assertEqual(checkpoint[61], (400.0, None))
+        self.assertEqual(self.loop.run_until_complete(get_sweep_marks())[60], 900.0)
+
+        self.loop.run_until_complete(add_swept_server(70))
+        self.assertEqual(self.loop.run_until_complete(get_swept_servers()), {70})
+        self.loop.run_until_complete(clear_swept_servers())
+        self.assertEqual(self.loop.run_until_complete(get_swept_servers()), set())
+
+    def test_settings(self):
+        self.assertIsNone(self.loop.run_until_complete(get_setting('command_hash:1')))
+        self.loop.run_until_complete(set_setting('command_hash:1', 'abc'))
+        self.loop.run_until_complete(set_setting('command_hash:1', 'def'))
+        self.assertEqual(self.loop.run_until_complete(get_setting('command_hash:1')), 'def')
+
+    def test_thread_meta(self):
+        async def rows():
+            return [row async for chunk in iter_thread_meta(2) for row in chunk if row[1] in (80, 81)]
+
+        self.loop.run_until_complete(write_thread_meta(
+            [(900, 80, 90, 100.0, 1440, 1, 100.0), (901, 80, 90, 200.0, 60, 0, 200.0),
+             (902, 80, 91, 300.0, 1440, 1, 300.0), (903, 81, 92, 400.0, 1440, 1, 400.0)], set(), {}))
+        self.assertEqual([row[0] for row in self.loop.run_until_complete(rows())], [900, 901, 902, 903])
+
+        # A complete pass started at 250 drops the rows of guild 80 it did not see again
+        self.loop.run_until_complete(write_thread_meta([(902, 80, 91, 300.0, 1440, 0, 300.0)], {903}, {80: 250.0}))
+        self.assertEqual(self.loop.run_until_complete(rows()), [(902, 80, 91, 300.0, 1440, 0, 300.0)])
+        self.assertIn(80, self.loop.run_until_complete(get_thread_meta_guilds()))
+
+        self.loop.run_until_complete(remove_server(80))
+        self.assertEqual(self.loop.run_until_complete(rows()), [])
+        self.assertNotIn(80, self.loop.run_until_complete(get_thread_meta_guilds()))
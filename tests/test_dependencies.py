@@ -0,0 +1,25 @@
+import os
+import tempfile
+import unittest
+from importlib import metadata
+from unittest import mock
+
+from src.dependencies import check_dependencies, get_installed_version
+
+
+class TestDependencies(unittest.TestCase):
+
+    def test_installed_version(self):
+        self.assertEqual(get_installed_version('aiosqlite'), metadata.version('aiosqlite'))
+        self.assertIsNone(get_installed_version('forumpulse-missing-package'))
+
+    def test_satisfied_requirements_skip_pip(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write(f"aiosqlite=={metadata.version('aiosqlite')}\ndiscord.py\n")
+        try:
+            with mock.patch('src.dependencies.subprocess') as subprocess:
+                check_dependencies(f.name)
+            subprocess.check_call.assert_not_called()
+            subprocess.check_output.assert_not_called()
+        finally:
+            os.unlink(f.name)
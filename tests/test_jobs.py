@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from src.jobs import JobRegistry
+
+
+class FakeSweep:
+    def __init__(self, server_id: int, manual: bool = False):
+        self.server_id = server_id
+        self.manual = manual
+        self.cancelled = False
+        self.finished = asyncio.Event()
+
+
+class TestJobRegistry(unittest.IsolatedAsyncioTestCase):
+
+    async def test_running_guild_is_coalesced(self):
+        registry = JobRegistry()
+        first = FakeSweep(1)
+
+        self.assertIs(registry.add(first), first)
+        self.assertIs(registry.add(FakeSweep(1)), first)
+        self.assertIs(registry.get(1), first)
+
+        registry.finish(first)
+        self.assertIsNone(registry.get(1))
+        self.assertTrue(first.finished.is_set())
+
+    async def test_cancel(self):
+        registry = JobRegistry()
+        sweep = registry.add(FakeSweep(1))
+
+        self.assertTrue(registry.cancel(1))
+        self.assertTrue(sweep.cancelled)
+        self.assertFalse(registry.cancel(1))
+        self.assertFalse(registry.cancel(2))
+
+    async def test_admission_control(self):
+        registry = JobRegistry(max_manual=1, min_interval=600)
+        sweep = registry.add(FakeSweep(1, manual=True))
+        self.assertTrue(registry.busy())
+
+        with mock.patch('src.jobs.time.monotonic', return_value=1000.0):
+            registry.finish(sweep)
+        self.assertFalse(registry.busy())
+        with mock.patch('src.jobs.time.monotonic', return_value=1200.0):
+            self.assertEqual(registry.retry_after(1), 400)
+            self.assertEqual(registry.retry_after(2), 0)
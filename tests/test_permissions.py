@@ -0,0 +1,46 @@
+import unittest
+from unittest import mock
+
+import discord
+
+from src.permissions import PermissionIndex
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild_id: int, perms: discord.Permissions):
+        self.id = channel_id
+        self.guild = mock.Mock(id=guild_id)
+        self.perms = perms
+        self.checks = 0
+
+    def permissions_for(self, member):
+        self.checks += 1
+        return self.perms
+
+
+class TestPermissionIndex(unittest.TestCase):
+
+    def test_missing_permissions_are_cached(self):
+        index = PermissionIndex()
+        channel = FakeChannel(10, 1, discord.Permissions(view_channel=True, send_messages=False))
+
+        self.assertEqual(index.missing(channel), ('manage_threads',))
+        self.assertEqual(index.missing(channel), ('manage_threads',))
+        self.assertEqual(channel.checks, 1)
+        self.assertFalse(index.allows(channel))
+
+    def test_invalidation(self):
+        index = PermissionIndex()
+        channel = FakeChannel(10, 1, discord.Permissions(view_channel=True))
+        other = FakeChannel(11, 1, discord.Permissions.all())
+        index.missing(channel)
+        index.missing(other)
+
+        channel.perms = discord.Permissions.all()
+        index.invalidate(1, 10)
+        self.assertTrue(index.allows(channel))
+        self.assertEqual(other.checks, 1)
+
+        index.invalidate(1)  # Role and member updates drop the whole guild
+        index.missing(other)
+        self.assertEqual(other.checks, 2)
@@ -0,0 +1,50 @@
+import unittest
+from unittest import mock
+
+import discord
+
+from src.plan import plan_server
+
+
+def fake_channel(spec, channel_id: int, **attrs):
+    channel = mock.Mock(spec=spec)
+    channel.id = channel_id
+    for name, value in attrs.items():
+        setattr(channel, name, value)
+    return channel
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, channels: list):
+        self.id = guild_id
+        self._channels = {channel.id: channel for channel in channels}
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+
+class TestPlanServer(unittest.TestCase):
+
+    def test_forum_inside_tracked_category_is_listed_once(self):
+        thread = mock.Mock(id=100)
+        forum = fake_channel(discord.ForumChannel, 10, threads=[thread])
+        text = fake_channel(discord.TextChannel, 11, threads=[])
+        voice = fake_channel(discord.VoiceChannel, 12)
+        category = fake_channel(discord.CategoryChannel, 1, channels=[forum, text, voice])
+        guild = FakeGuild(7, [category, forum, text, voice])
+
+        plan = plan_server(guild, {'category': [1], 'forum': [10], 'post': [100, 200, 200]})
+
+        self.assertEqual(list(plan.forums), [10, 11])
+        self.assertEqual(list(plan.posts), [100, 200])
+        self.assertEqual(plan.active_threads(), {100, 200})
+        self.assertEqual(plan.missing, [])
+
+    def test_missing_channels_are_reported(self):
+        guild = FakeGuild(7, [])
+
+        plan = plan_server(guild, {'category': [1], 'forum': [10], 'post': [100]})
+
+        self.assertEqual(plan.forums, {})
+        self.assertEqual(plan.missing, [10, 1])
+
@@ -0,0 +1,61 @@
+import asyncio
+import time
+import unittest
+
+from src.ratelimit import RateLimiter, TokenBucket, parse_route, ROUTE_EDIT_THREAD, ROUTE_ARCHIVED_THREADS
+
+
+class TestParseRoute(unittest.TestCase):
+
+    def test_parse_route(self):
+        self.assertEqual(parse_route('patch', '/api/v10/channels/1290278519041036288'), (ROUTE_EDIT_THREAD, 1290278519041036288))
+        self.assertEqual(parse_route('GET', '/api/v10/channels/1292842153629974622/threads/archived/public'), (ROUTE_ARCHIVED_THREADS, 1292842153629974622))
+        self.assertEqual(parse_route('GET', '/api/v10/gateway'), ('GET /gateway', None))
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_delay(self):
+        bucket = TokenBucket(rate=2, capacity=2)
+        now = bucket.updated
+        for _ in range(2):
+            self.assertEqual(bucket.delay(now), 0)
+            bucket.consume()
+        self.assertAlmostEqual(bucket.delay(now), 0.5)
+        self.assertEqual(bucket.delay(now + 0.5), 0)
+
+    def test_block(self):
+        bucket = TokenBucket(rate=100)
+        now = bucket.updated
+        bucket.block(now + 3)
+        self.assertAlmostEqual(bucket.delay(now), 3)
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_route_pacing(self):
+        limiter = RateLimiter(global_rate=1000, route_rates={ROUTE_EDIT_THREAD: 50})
+        start = time.monotonic()
+        for thread_id in range(60):
+            await limiter.acquire(ROUTE_EDIT_THREAD, thread_id)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)  # 10 requests over the burst at 50/s
+        self.assertEqual(limiter.requests, 60)
+        self.assertGreater(limiter.throttled_by_route[ROUTE_EDIT_THREAD], 0)
+
+    async def test_exhausted_bucket_header_blocks_major(self):
+        limiter = RateLimiter(global_rate=1000, route_rates={})
+        limiter.observe(ROUTE_ARCHIVED_THREADS, 1, 200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '0.1'})
+
+        await asyncio.wait_for(limiter.acquire(ROUTE_ARCHIVED_THREADS, 2), 0.05)  # Other forums are not affected
+        start = time.monotonic()
+        await limiter.acquire(ROUTE_ARCHIVED_THREADS, 1)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    async def test_global_429_blocks_every_route(self):
+        limiter = RateLimiter(global_rate=1000, route_rates={})
+        limiter.observe(ROUTE_EDIT_THREAD, 1, 429, {'Retry-After': '0.1', 'X-RateLimit-Global': 'true'})
+
+        self.assertEqual(limiter.rate_limited, 1)
+        start = time.monotonic()
+        await limiter.acquire(ROUTE_ARCHIVED_THREADS, 2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
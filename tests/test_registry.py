@@ -0,0 +1,49 @@
+import unittest
+
+from src.registry import TrackedRegistry
+
+
+class TestTrackedRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = TrackedRegistry()
+        self.registry.load({
+            1: {'category': [10], 'forum': [11], 'post': [12]},
+            2: {'category': [], 'forum': [], 'post': []},
+        })
+
+    def test_load(self):
+        self.assertTrue(self.registry.loaded)
+        self.assertEqual(self.registry.servers(), [1, 2])
+        self.assertEqual(self.registry.channels(1), {'category': [10], 'forum': [11], 'post': [12]})
+        self.assertEqual(self.registry.type_of(1, 11), 'forum')
+
+    def test_add(self):
+        self.assertTrue(self.registry.add(2, 'post', 20))
+        self.assertFalse(self.registry.add(2, 'forum', 20))  # Same item can only be tracked once per server
+        self.assertEqual(self.registry.items(2), [(20, 'post')])
+
+    def test_remove(self):
+        self.assertTrue(self.registry.remove(1, 11))
+        self.assertFalse(self.registry.remove(1, 11))
+        self.assertFalse(self.registry.exists(1, 11))
+        self.assertEqual(self.registry.channels(1)['forum'], [])
+
+    def test_remove_server(self):
+        self.registry.remove_server(1)
+        self.assertEqual(self.registry.servers(), [2])
+        self.assertEqual(self.registry.channels(1), {'category': [], 'forum': [], 'post': []})
+
+    def test_snapshot(self):
+        snapshot = self.registry.snapshot([1, 3])
+        self.assertEqual(list(snapshot), [1])
+        snapshot[1]['post'].append(99)  # Snapshots are copies
+        self.assertFalse(self.registry.exists(1, 99))
+
+    def test_is_thread_monitored(self):
+        self.assertTrue(self.registry.is_thread_monitored(1, 12))  # Tracked post
+        self.assertTrue(self.registry.is_thread_monitored(1, 50, parent_id=11))  # Thread in a tracked forum
+        self.assertTrue(self.registry.is_thread_monitored(1, 51, parent_id=40, category_id=10))  # Forum inside a tracked category
+        self.assertFalse(self.registry.is_thread_monitored(1, 52, parent_id=40, category_id=41))
+        self.assertFalse(self.registry.is_thread_monitored(2, 12, parent_id=11, category_id=10))  # Other server
+        self.assertFalse(self.registry.is_thread_monitored(3, 12))
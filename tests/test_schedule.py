@@ -0,0 +1,23 @@
+import unittest
+
+from src.schedule import sweep_offset, sweep_trigger
+
+
+class TestSweepSchedule(unittest.TestCase):
+
+    def test_offset_is_stable_and_in_window(self):
+        guild_id = 1290278519041036288
+        self.assertEqual(sweep_offset(guild_id), sweep_offset(guild_id))
+        for window_hours in (1, 6, 24):
+            self.assertLess(sweep_offset(guild_id, window_hours), window_hours * 3600)
+
+    def test_offsets_spread_over_window(self):
+        hours = [0] * 24
+        for guild_id in range(1290278519041036288, 1290278519041036288 + 2400):
+            hours[sweep_offset(guild_id) // 3600] += 1
+        self.assertLess(max(hours) - min(hours), 60)  # Roughly 100 guilds per hour
+
+    def test_trigger_wraps_past_midnight(self):
+        trigger = sweep_trigger(1290278519041036288, window_start=23, window_hours=2)
+        fields = {field.name: str(field) for field in trigger.fields}
+        self.assertIn(int(fields['hour']), (23, 0))
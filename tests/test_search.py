@@ -0,0 +1,56 @@
+import unittest
+
+from src.search import NameSet, NameIndex
+
+
+class TestNameSet(unittest.TestCase):
+
+    def setUp(self):
+        self.names = NameSet()
+        for item_id, name in enumerate(["Bug Reports", "Feature Requests", "Help", "help-desk", "Übersicht", "Off topic"], start=1):
+            self.names.add(item_id, name)
+
+    def search(self, query: str, limit: int = 25) -> list[str]:
+        return [name for _, name in self.names.search(query, limit)]
+
+    def test_prefix_matches_rank_first(self):
+        self.assertEqual(self.search("hel"), ["Help", "help-desk"])
+        self.assertEqual(self.search("re"), ["Bug Reports", "Feature Requests"])  # Substring matches of a short query
+
+    def test_substring_and_case_folding(self):
+        self.assertEqual(self.search("REQUEST"), ["Feature Requests"])
+        self.assertEqual(self.search("ÜBER"), ["Übersicht"])
+        self.assertEqual(self.search("desk"), ["help-desk"])
+        self.assertEqual(self.search("xyz"), [])
+
+    def test_empty_query_and_limit(self):
+        self.assertEqual(len(self.search("")), 6)
+        self.assertEqual(len(self.search("", limit=2)), 2)
+        self.assertEqual(len(self.search("e", limit=3)), 3)
+
+    def test_rename_and_remove(self):
+        self.names.add(3, "Support")
+        self.assertEqual(self.search("help"), ["help-desk"])
+        self.assertEqual(self.search("port"), ["Bug Reports", "Support"])
+
+        self.assertTrue(self.names.remove(3))
+        self.assertFalse(self.names.remove(3))
+        self.assertEqual(self.search("sup"), [])
+        self.assertNotIn("sup", self.names.postings)
+
+    def test_large_set_is_capped(self):
+        names = NameSet()
+        for item_id in range(5000):
+            names.add(item_id, f"thread {item_id}")
+
+        results = names.search("read 12")
+        self.assertEqual(len(results), 25)
+        self.assertTrue(all("read 12" in name for _, name in results))
+        self.assertEqual(len(names.search("thread")), 25)
+        self.assertEqual(names.search("thread 4999"), [(4999, "thread 4999")])
+
+
+class TestNameIndex(unittest.TestCase):
+
+    def test_unknown_guild(self):
+        self.assertEqual(NameIndex().search(1, 'post', "a"), [])
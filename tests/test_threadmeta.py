@@ -0,0 +1,51 @@
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from src import threadmeta
+from src.threadmeta import ThreadMetaStore
+
+
+class FakeThread:
+    def __init__(self, thread_id: int, archived: bool = False):
+        self.id = thread_id
+        self.parent_id = 10
+        self.archive_timestamp = datetime.fromtimestamp(100, tz=timezone.utc)
+        self.auto_archive_duration = 1440
+        self.archived = archived
+
+
+class TestThreadMetaStore(unittest.IsolatedAsyncioTestCase):
+
+    async def test_changes_are_coalesced_into_one_batch(self):
+        store = ThreadMetaStore(batch_size=2)
+        store.record(1, FakeThread(20, archived=True))
+        store.record(1, FakeThread(20))  # Latest state wins
+        store.remove(21)
+        store.record(1, FakeThread(21))
+        self.assertTrue(store._due.is_set())
+        store.complete(1, 50.0)
+
+        with mock.patch.object(threadmeta.db, 'write_thread_meta', mock.AsyncMock()) as write:
+            self.assertEqual(await store.flush(), 2)
+            self.assertEqual(await store.flush(), 0)
+
+        rows, removed, complete = write.await_args.args
+        self.assertEqual([(row[0], row[5]) for row in rows], [(20, 0), (21, 0)])
+        self.assertEqual((removed, complete), (set(), {1: 50.0}))
+        self.assertEqual(write.await_count, 1)
+
+    async def test_failed_flush_keeps_the_batch(self):
+        store = ThreadMetaStore()
+        store.record(1, FakeThread(20))
+        store.remove(22)
+
+        with mock.patch.object(threadmeta.db, 'write_thread_meta', mock.AsyncMock(side_effect=OSError)):
+            with self.assertRaises(OSError):
+                await store.flush()
+        self.assertEqual(len(store), 2)
+
+        with mock.patch.object(threadmeta.db, 'write_thread_meta', mock.AsyncMock()) as write:
+            await store.close()
+        self.assertEqual(write.await_args.args[1], {22})
+        self.assertEqual(store.written, 1)
@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from src.timers import TimerHeap
+
+
+class TestTimerHeap(unittest.TestCase):
+
+    def test_pop_due_in_order(self):
+        timers = TimerHeap()
+        timers.schedule(1, 30)
+        timers.schedule(2, 10)
+        timers.schedule(3, 20)
+
+        self.assertEqual(timers.next_deadline(), 10)
+        self.assertEqual(timers.pop_due(25), [2, 3])
+        self.assertEqual(len(timers), 1)
+        self.assertEqual(timers.pop_due(100), [1])
+        self.assertIsNone(timers.next_deadline())
+
+    def test_reschedule_and_cancel(self):
+        timers = TimerHeap()
+        timers.schedule(1, 10)
+        timers.schedule(2, 20)
+        timers.schedule(1, 30)  # Activity pushed the deadline back
+        timers.cancel(2)
+
+        self.assertEqual(timers.next_deadline(), 30)
+        self.assertEqual(timers.pop_due(25), [])
+        self.assertEqual(timers.pop_due(30), [1])
+        self.assertNotIn(1, timers)
+
+    def test_stale_entries_are_compacted(self):
+        timers = TimerHeap()
+        for deadline in range(5000):
+            timers.schedule(1, deadline)
+        self.assertLess(len(timers._heap), 2 * len(timers) + 1025)
+
+    def test_matches_sorted_order(self):
+        rng = random.Random(0)
+        timers = TimerHeap()
+        expected = {}
+        for _ in range(2000):
+            key = rng.randrange(300)
+            if rng.random() < 0.2:
+                timers.cancel(key)
+                expected.pop(key, None)
+            else:
+                deadline = rng.random() * 1000
+                timers.schedule(key, deadline)
+                expected[key] = deadline
+
+        due = timers.pop_due(500)
+        self.assertEqual(due, sorted((key for key, deadline in expected.items() if deadline <= 500), key=expected.get))
+        self.assertEqual(len(timers), sum(1 for deadline in expected.values() if deadline > 500))
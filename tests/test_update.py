@@ -0,0 +1,528 @@
+import asyncio
+import contextlib
+import io
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+import discord
+
+from src import update
+from src.permissions import PermissionIndex
+from src.cache import MonitoredCache
+from src.counter import MonitoredCounter
+from src.ratelimit import RateLimiter
+from src.stats import StatsAggregator
+from src.threadmeta import ThreadMetaStore
+from src.registry import TrackedRegistry
+from src.workqueue import WorkQueue
+
+
+class FakeThread:
+    def __init__(self, thread_id: int, archived_at: float, archived: bool = True, error: Exception = None, parent=None):
+        self.id = thread_id
+        self.parent = parent
+        self.parent_id = parent.id if parent else None
+        self.archive_timestamp = datetime.fromtimestamp(archived_at, tz=timezone.utc)
+        self.archived = archived
+        self.auto_archive_duration = 1440
+        self.error = error
+        self.edits = []
+
+    async def edit(self, **kwargs):
+        self.edits.append(kwargs)
+        if self.error:
+            raise self.error
+        self.archived = kwargs.get('archived', self.archived)
+
+
+class FakeForum:
+    def __init__(self, forum_id: int, threads: list[FakeThread], perms: discord.Permissions = None):
+        self.id = forum_id
+        self.guild = mock.Mock(id=7)
+        self.perms = perms or discord.Permissions.all()
+        self._threads = sorted(threads, key=lambda thread: thread.archive_timestamp, reverse=True)
+        self.pages = 0
+
+    def permissions_for(self, member):
+        return self.perms
+
+    async def archived_threads(self, limit=None, before=None):
+        self.pages += 1
+        threads = [thread for thread in self._threads if before is None or thread.archive_timestamp < before]
+        for thread in threads[:limit]:
+            yield thread
+
+
+class SlowForum(FakeForum):
+    active = 0
+    peak = 0
+
+    async def archived_threads(self, limit=None, before=None):
+        SlowForum.active += 1
+        SlowForum.peak = max(SlowForum.peak, SlowForum.active)
+        try:
+            await asyncio.sleep(0.01)
+            async for thread in super().archived_threads(limit, before):
+                yield thread
+        finally:
+            SlowForum.active -= 1
+
+
+class FailingForum(FakeForum):
+    def __init__(self, forum_id: int, error: Exception):
+        super().__init__(forum_id, [])
+        self.error = error
+
+    async def archived_threads(self, limit=None, before=None):
+        raise self.error
+        yield
+
+
+def http_error(status: int, cls=discord.HTTPException) -> discord.HTTPException:
+    return cls(mock.Mock(status=status, reason='error'), 'error')
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, cached: list[FakeThread] = (), active: list[FakeThread] = (), channels: list = ()):
+        self.id = guild_id
+        self._cached = {thread.id: thread for thread in cached}
+        self._active = active if isinstance(active, Exception) else list(active)
+        self._channels = {channel.id: channel for channel in channels}
+
+    def get_thread(self, thread_id: int):
+        return self._cached.get(thread_id)
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+    async def active_threads(self):
+        if isinstance(self._active, Exception):
+            raise self._active
+        return self._active
+
+
+class FakeBot:
+    def __init__(self, guild: FakeGuild, threads: list[FakeThread] = ()):
+        self.guild = guild
+        self.threads = {thread.id: thread for thread in threads}
+        self.fetched = []
+
+    def get_guild(self, guild_id: int):
+        return self.guild if guild_id == self.guild.id else None
+
+    async def fetch_channel(self, channel_id: int):
+        self.fetched.append(channel_id)
+        return self.threads[channel_id]
+
+
+async def sweep_forum(forum: FakeForum, marks: dict, already_check: set = (), checkpoint: dict = None) -> update.ServerSweep:
+    sweep = update.ServerSweep(None, 1, {}, marks, checkpoint=checkpoint)
+    sweep.already_check.update(already_check)
+    sweep.queue = WorkQueue(workers=2)
+    sweep.queue_forums([forum])
+    await sweep.queue.join()
+    return sweep
+
+
+def patch_sweep(test: unittest.TestCase) -> dict[str, mock.AsyncMock]:
+    patches = (
+        ('limiter', RateLimiter(global_rate=1e6, route_rates={})),
+        ('permissions', PermissionIndex()),
+        ('monitored', MonitoredCounter()),
+        ('stats', StatsAggregator()),
+        ('thread_meta', ThreadMetaStore()),
+        ('sweep_queue', WorkQueue()),
+    )
+    for name, value in patches:
+        patcher = mock.patch.object(update, name, value)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+    mocks = {}
+    for name in ('finish_forum_sweep', 'save_forum_checkpoint', 'add_swept_server'):
+        patcher = mock.patch.object(update.db, name, mock.AsyncMock())
+        mocks[name] = patcher.start()
+        test.addCleanup(patcher.stop)
+    return mocks
+
+
+class TestSweepForum(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.db = patch_sweep(self)
+
+    async def test_full_sweep_records_mark(self):
+        forum = FakeForum(1, [FakeThread(10, 100), FakeThread(11, 200), FakeThread(12, 300)])
+
+        sweep = await sweep_forum(forum, {})
+
+        self.assertEqual(sweep.unarchived_threads, 3)
+        self.assertEqual(sweep.new_marks, {1: 300})
+        self.assertEqual(update.monitored.count(1), 3)  # Listed archives feed the monitored-thread counter
+        self.assertEqual(len(update.thread_meta), 3)  # And are queued for the thread metadata table
+
+    async def test_pages_until_exhausted(self):
+        threads = [FakeThread(i, 1000 + i) for i in range(update.ARCHIVED_PAGE_SIZE * 2 + 5)]
+        forum = FakeForum(1, threads)
+
+        sweep = await sweep_forum(forum, {})
+
+        self.assertEqual(sweep.unarchived_threads, len(threads))
+        self.assertEqual(forum.pages, 3)
+        self.assertTrue(all(thread.edits == [{'archived': False}] for thread in threads))
+
+    async def test_incremental_sweep_stops_at_mark(self):
+        old = FakeThread(10, 100)
+        forum = FakeForum(1, [old, FakeThread(11, 200), FakeThread(12, 300)])
+
+        sweep = await sweep_forum(forum, {1: 200})
+
+        self.assertEqual(sweep.unarchived_threads, 1)
+        self.assertEqual(old.edits, [])
+        self.assertEqual(sweep.new_marks, {1: 300})
+
+    async def test_failed_edits_hold_back_mark(self):
+        failed = FakeThread(11, 200, error=http_error(403, discord.Forbidden))
+        forum = FakeForum(1, [FakeThread(10, 100), failed, FakeThread(12, 300)])
+
+        sweep = await sweep_forum(forum, {1: 50})
+
+        self.assertEqual(sweep.unarchived_threads, 2)
+        self.assertLess(sweep.new_marks[1], 200)
+        self.assertGreater(sweep.new_marks[1], 100)
+
+        # The next sweep starts above the failed thread and retries it
+        failed.error = None
+        sweep = await sweep_forum(forum, sweep.new_marks)
+        self.assertEqual(failed.edits, [{'archived': False}] * 2)
+        self.assertEqual(sweep.new_marks, {1: 300})
+
+    async def test_unexpected_edit_error_holds_back_mark(self):
+        failed = FakeThread(11, 200, error=http_error(500))
+        forum = FakeForum(1, [failed, FakeThread(12, 300)])
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            sweep = await sweep_forum(forum, {})
+
+        self.assertLess(sweep.new_marks[1], 200)
+
+    async def test_already_checked_threads_are_skipped(self):
+        thread = FakeThread(10, 100)
+        forum = FakeForum(1, [thread])
+
+        sweep = await sweep_forum(forum, {}, {10})
+
+        self.assertEqual(sweep.unarchived_threads, 0)
+        self.assertEqual(thread.edits, [])
+
+    async def test_forums_run_concurrently_within_guild_limit(self):
+        shared = FakeThread(99, 500)
+        forums = [SlowForum(i, [FakeThread(i * 10, 100 + i), shared]) for i in range(1, 9)]
+        sweep = update.ServerSweep(None, 1, {}, {})
+        sweep.queue = WorkQueue(workers=16)
+
+        with mock.patch.object(update, 'SWEEP_GUILD_FORUMS', 3):
+            sweep.queue_forums(forums)
+            await sweep.queue.join()
+
+        self.assertEqual(SlowForum.peak, 3)
+        self.assertEqual(sweep.unarchived_threads, 9)  # The thread listed by every forum is edited once
+        self.assertEqual(shared.edits, [{'archived': False}])
+        self.assertEqual(sweep.forums_pending, 0)
+
+    async def test_settled_pages_are_checkpointed(self):
+        threads = [FakeThread(i, 1000 + i) for i in range(update.ARCHIVED_PAGE_SIZE + 5)]
+        forum = FakeForum(1, threads)
+
+        await sweep_forum(forum, {})
+
+        cursors = [call.args[1] for call in self.db['save_forum_checkpoint'].await_args_list]
+        self.assertIn(threads[5].archive_timestamp.timestamp(), cursors)  # Oldest thread of the first page
+        self.db['finish_forum_sweep'].assert_awaited_once()
+        self.assertEqual(self.db['finish_forum_sweep'].await_args.args[:2], (1, threads[-1].archive_timestamp.timestamp()))
+
+    async def test_resumes_from_checkpoint(self):
+        threads = [FakeThread(i, 1000 + i) for i in range(10)]
+        forum = FakeForum(1, threads)
+
+        sweep = await sweep_forum(forum, {}, checkpoint={1: (1005.0, 1009.0)})
+
+        self.assertEqual(sweep.unarchived_threads, 5)
+        self.assertTrue(all(thread.edits == [] for thread in threads[5:]))
+        self.assertEqual(sweep.new_marks, {1: 1009.0})  # The newest archive seen before the restart
+
+    async def test_incomplete_listing_keeps_checkpoint(self):
+        sweep = await sweep_forum(FailingForum(1, http_error(500)), {}, checkpoint={1: (1005.0, 1009.0)})
+
+        self.assertEqual(sweep.new_marks, {})
+        self.db['finish_forum_sweep'].assert_not_awaited()
+
+
+class TestResolvePosts(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.db = patch_sweep(self)
+
+    async def test_posts_are_resolved_before_fetching(self):
+        cached = FakeThread(1, 100)
+        active = FakeThread(2, 100, archived=False)
+        in_forum = FakeThread(3, 100)
+        elsewhere = FakeThread(4, 100)
+        forum = FakeForum(10, [in_forum, FakeThread(5, 50)])
+        guild = FakeGuild(7, cached=[cached], active=[active], channels=[forum])
+        bot = FakeBot(guild, threads=[elsewhere])
+
+        sweep = update.ServerSweep(bot, guild.id, {'category': [], 'forum': [10], 'post': [1, 2, 3, 4]}, {})
+        await update.run_sweeps([sweep])
+
+        self.db['finish_forum_sweep'].assert_awaited_once()
+        self.assertEqual(self.db['finish_forum_sweep'].await_args.args[:2], (10, 100))
+
+        self.assertEqual(bot.fetched, [4])  # Only the post missing from the cache, active threads and forum archives
+        self.assertEqual((update.stats.sweeps, update.stats.unarchived), (1, 4))
+        self.assertEqual(sweep.unarchived_threads, 4)  # Threads 1, 3, 4 and the untracked forum thread 5
+        self.assertEqual(active.edits, [])
+        self.assertEqual(in_forum.edits, [{'archived': False}])
+
+    async def run_post_sweep(self, forums: list, guild: FakeGuild, bot: FakeBot, posts: list[int]) -> update.ServerSweep:
+        guild._channels.update((forum.id, forum) for forum in forums)
+        sweep = update.ServerSweep(bot, guild.id, {'category': [], 'forum': [forum.id for forum in forums], 'post': posts}, {})
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            await update.run_sweeps([sweep])
+        return sweep
+
+    async def test_failing_forum_page_still_fetches_posts(self):
+        for error in (http_error(404, discord.NotFound), http_error(500), RuntimeError("boom")):
+            post = FakeThread(4, 100)
+            guild = FakeGuild(7)
+            bot = FakeBot(guild, threads=[post])
+
+            sweep = await self.run_post_sweep([FailingForum(10, error)], guild, bot, [4])
+
+            self.assertEqual(bot.fetched, [4])
+            self.assertEqual(sweep.unarchived_threads, 1)
+            self.assertEqual(sweep.new_marks, {})
+
+    async def test_failing_active_threads_falls_back_to_fetch(self):
+        post = FakeThread(4, 100)
+        guild = FakeGuild(7, active=http_error(500))
+        bot = FakeBot(guild, threads=[post])
+
+        sweep = await self.run_post_sweep([], guild, bot, [4])
+
+        self.assertEqual(bot.fetched, [4])
+        self.assertEqual(sweep.unarchived_threads, 1)
+
+
+class TestForumActivity(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.db = patch_sweep(self)
+
+    def test_interval_shrinks_for_busy_forums(self):
+        quiet = update.next_interval(1)
+        busy = update.next_interval(100)
+        self.assertLess(busy, quiet)
+        self.assertEqual(update.next_interval(0), update.SWEEP_INTERVAL_MAX)
+        self.assertEqual(update.next_interval(1e9), update.SWEEP_INTERVAL_MIN)
+
+    def test_rate_is_smoothed(self):
+        now = 10 * 86400
+        last_sweep, rate, next_sweep = update.update_activity((now - 86400, 10.0, now), 40, now)
+        self.assertEqual(last_sweep, now)
+        self.assertAlmostEqual(rate, 0.3 * 40 + 0.7 * 10)
+        self.assertEqual(next_sweep, now + update.next_interval(rate))
+
+    async def test_forums_not_due_are_skipped(self):
+        due = FakeForum(10, [FakeThread(1, 100)])
+        later = FakeForum(11, [FakeThread(2, 100)])
+        activity = {11: (0.0, 0.0, float('inf'))}
+        guild = FakeGuild(7, channels=[due, later])
+        sweep = update.ServerSweep(FakeBot(guild), 7, {'category': [], 'forum': [10, 11], 'post': []}, {}, activity)
+        await update.run_sweeps([sweep])
+
+        self.assertEqual(later.pages, 0)
+        self.assertEqual(sweep.unarchived_threads, 1)
+        forum_id, _, activity = self.db['finish_forum_sweep'].await_args.args
+        self.assertEqual(forum_id, 10)
+        self.assertEqual(activity[1], 1)
+
+    async def test_manual_sweeps_ignore_schedule(self):
+        forum = FakeForum(10, [FakeThread(1, 100)])
+        activity = {10: (0.0, 0.0, float('inf'))}
+        sweep = update.ServerSweep(FakeBot(FakeGuild(7, channels=[forum])), 7, {'category': [], 'forum': [10], 'post': []}, {}, activity, force=True)
+        await update.run_sweeps([sweep])
+
+        self.assertEqual(forum.pages, 1)
+        self.assertEqual(sweep.unarchived_threads, 1)
+
+    async def test_overdue_forums_are_swept(self):
+        now = time.time()
+        forum = FakeForum(10, [FakeThread(1, 100)])
+        activity = {10: (now - 2 * 86400, 5.0, now - 86400)}
+        sweep = update.ServerSweep(FakeBot(FakeGuild(7, channels=[forum])), 7, {'category': [], 'forum': [10], 'post': []}, {}, activity)
+
+        self.assertTrue(sweep.is_due(10))
+        await update.run_sweeps([sweep])
+
+        self.assertEqual(forum.pages, 1)
+        last_sweep, _, next_sweep = self.db['finish_forum_sweep'].await_args.args[2]
+        self.assertGreaterEqual(last_sweep, now)
+        self.assertGreater(next_sweep, now)
+
+
+class TestPermissions(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.db = patch_sweep(self)
+
+    async def test_forums_without_permissions_are_skipped(self):
+        blocked = FakeForum(10, [FakeThread(1, 100)], perms=discord.Permissions(view_channel=True))
+        allowed = FakeForum(11, [FakeThread(2, 100)])
+        post = FakeThread(3, 100, parent=blocked)
+        guild = FakeGuild(7, cached=[post], channels=[blocked, allowed])
+        guild.name = "guild"
+        sweep = update.ServerSweep(FakeBot(guild), 7, {'category': [], 'forum': [10, 11], 'post': [3]}, {})
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            await update.run_sweeps([sweep])
+
+        self.assertEqual(blocked.pages, 0)
+        self.assertEqual(post.edits, [])
+        self.assertEqual(sweep.unarchived_threads, 1)
+        self.assertEqual(sweep.skipped, {10: ('manage_threads',)})
+        self.assertIn("manage_threads", output.getvalue())
+
+
+class TestReconcile(unittest.IsolatedAsyncioTestCase):
+
+    async def test_missing_guilds_and_channels_are_removed_in_one_batch(self):
+        registry = TrackedRegistry()
+        registry.load({
+            7: {'category': [1], 'forum': [10, 11], 'post': [100]},
+            8: {'category': [], 'forum': [20], 'post': []},
+        })
+        guild = FakeGuild(7, channels=[FakeForum(10, [])])
+        guild.unavailable = False
+
+        meta = ThreadMetaStore()
+        meta.record(8, FakeThread(80, 100))
+        with mock.patch.object(update, 'tracked', registry), mock.patch.object(update, 'thread_meta', meta), \
+                mock.patch.object(update.db, 'remove_stale', mock.AsyncMock()) as remove_stale:
+            removed = await update.reconcile_tracked(FakeBot(guild))
+
+        remove_stale.assert_awaited_once_with([8], [(7, 11), (7, 1)])
+        self.assertEqual(len(meta), 0)  # Pending metadata of removed guilds is dropped
+        self.assertEqual(removed, (1, 2))
+
+
+class TestThreadMeta(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patch_sweep(self)
+
+    async def test_startup_load_restores_monitored_threads(self):
+        registry = TrackedRegistry()
+        registry.load({7: {'category': [], 'forum': [10], 'post': [100]}})
+        forum, untracked = FakeForum(10, []), FakeForum(11, [])
+        forum.category_id = untracked.category_id = None
+        bot = FakeBot(FakeGuild(7, channels=[forum, untracked]))
+        bot.monitored_cache = MonitoredCache()
+        rows = [(1, 7, 10, 100.0, 1440, 1, 100.0), (2, 7, 10, 200.0, 1440, 0, 200.0),
+                (3, 7, 11, 300.0, 1440, 1, 300.0), (4, 8, 20, 400.0, 1440, 1, 400.0)]
+
+        async def iter_thread_meta(chunk_size):
+            for i in range(0, len(rows), chunk_size):
+                yield rows[i:i + chunk_size]
+
+        with mock.patch.object(update, 'tracked', registry), \
+                mock.patch.object(update.db, 'get_thread_meta_guilds', mock.AsyncMock(return_value={7, 8})), \
+                mock.patch.object(update.db, 'iter_thread_meta', iter_thread_meta):
+            restored = await update.load_thread_meta(bot, chunk_size=3)
+
+        self.assertEqual(restored, {7})
+        self.assertEqual(update.monitored.ids(7), [1, 2])
+        self.assertEqual(list(await bot.monitored_cache.get(7, mock.AsyncMock())), [1, 2])
+        self.assertEqual(len(update.thread_meta), 2)  # Rows no longer monitored are queued for removal
+
+
+class TestMonitoredChannels(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patch_sweep(self)
+        self.registry = TrackedRegistry()
+        self.registry.load({7: {'category': [], 'forum': [10], 'post': [100, 101]}})
+        for name, value in (('tracked', self.registry), ('THREAD_PARENTS', (FakeForum,))):
+            patcher = mock.patch.object(update, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.forum, self.other = FakeForum(10, [FakeThread(1, 100), FakeThread(2, 200)]), FakeForum(11, [FakeThread(3, 300)])
+        for forum in (self.forum, self.other):
+            forum.threads, forum.category_id = [], None
+        self.guild = FakeGuild(7, channels=[self.forum, self.other])
+
+    async def test_added_forum_is_listed_alone(self):
+        self.assertEqual(await update.add_monitored_channel(self.guild, 10), 2)
+        self.assertEqual(await update.add_monitored_channel(self.guild, 100), 1)
+
+        self.assertEqual(sorted(update.monitored.ids(7)), [1, 2, 100])
+        self.assertEqual((self.forum.pages, self.other.pages), (1, 0))
+
+    async def test_removed_channels_keep_covered_threads(self):
+        update.monitored.add(7, 1, 10)
+        update.monitored.add(7, 100, 11)
+        update.monitored.add(7, 101, 10)
+
+        self.registry.remove(7, 101)
+        self.assertEqual(update.remove_monitored_channel(self.guild, 101, 'post'), 0)  # Still listed through its forum
+        self.registry.remove(7, 100)
+        self.assertEqual(update.remove_monitored_channel(self.guild, 100, 'post'), 1)
+        self.registry.remove(7, 10)
+        self.assertEqual(update.remove_monitored_channel(self.guild, 10, 'forum'), 2)
+        self.assertEqual(update.monitored.count(7), 0)
+
+
+class TestJobs(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.db = patch_sweep(self)
+
+    async def test_concurrent_updates_share_one_sweep(self):
+        forum = SlowForum(10, [FakeThread(1, 100)])
+        bot = FakeBot(FakeGuild(7, channels=[forum]))
+        channels = {'category': [], 'forum': [10], 'post': []}
+
+        results = await asyncio.gather(
+            update.process_server(7, bot, channels, {}),
+            update.process_server(7, bot, channels, {}),
+        )
+
+        self.assertEqual(results, [1, 1])
+        self.assertEqual(forum.pages, 1)
+        self.assertIsNone(update.jobs.get(7))
+
+    async def test_sweeps_share_one_worker_pool(self):
+        SlowForum.peak = 0
+        channels = {'category': [], 'forum': [10], 'post': []}
+        sweeps = [update.ServerSweep(FakeBot(FakeGuild(guild_id, channels=[SlowForum(10, [FakeThread(guild_id, 100)])])), guild_id, channels, {})
+                  for guild_id in (7, 8, 9)]
+
+        with mock.patch.object(update, 'sweep_queue', WorkQueue(workers=1)):
+            await asyncio.gather(*(update.run_sweeps([sweep]) for sweep in sweeps))
+
+        self.assertEqual(SlowForum.peak, 1)  # Separate runs are still bounded by the one queue
+        self.assertEqual([sweep.unarchived_threads for sweep in sweeps], [1, 1, 1])
+
+    async def test_cancelled_sweep_stops_submitting(self):
+        forum = FakeForum(10, [FakeThread(i, 1000 + i) for i in range(update.ARCHIVED_PAGE_SIZE * 3)])
+        sweep = update.ServerSweep(FakeBot(FakeGuild(7, channels=[forum])), 7, {'category': [], 'forum': [10], 'post': []}, {})
+        sweep.resumable = True
+        sweep.cancelled = True
+
+        await update.run_sweeps([sweep])
+
+        self.assertEqual(forum.pages, 0)
+        self.assertTrue(sweep.finished.is_set())
+        self.db['add_swept_server'].assert_not_awaited()
@@ -0,0 +1,29 @@
+import unittest
+
+import discord
+from discord import app_commands
+
+from src.utils import command_hash
+
+
+def make_tree(description: str = "Ping the bot.", reverse: bool = False) -> app_commands.CommandTree:
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+
+    async def ping(interaction: discord.Interaction):
+        pass
+
+    async def stats(interaction: discord.Interaction):
+        pass
+
+    commands = [app_commands.Command(name="ping", description=description, callback=ping),
+                app_commands.Command(name="stats", description="Show stats.", callback=stats)]
+    for command in reversed(commands) if reverse else commands:
+        tree.add_command(command)
+    return tree
+
+
+class TestCommandHash(unittest.TestCase):
+
+    def test_hash_follows_definitions(self):
+        self.assertEqual(command_hash(make_tree()), command_hash(make_tree(reverse=True)))
+        self.assertNotEqual(command_hash(make_tree()), command_hash(make_tree("Ping the bot again.")))
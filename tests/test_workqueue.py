@@ -0,0 +1,80 @@
+import asyncio
+import contextlib
+import io
+import unittest
+
+from src.workqueue import WorkQueue
+
+
+class TestWorkQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def test_jobs_can_submit_jobs(self):
+        queue = WorkQueue(workers=3)
+        done = []
+
+        async def child(i):
+            await asyncio.sleep(0)
+            done.append(i)
+
+        async def parent():
+            for i in range(5):
+                queue.submit(child, i)
+
+        queue.submit(parent)
+        await queue.join()
+
+        self.assertEqual(sorted(done), [0, 1, 2, 3, 4])
+        self.assertEqual(queue.completed, 6)
+
+    async def test_worker_limit(self):
+        queue = WorkQueue(workers=2)
+        running = 0
+        peak = 0
+
+        async def job():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        for _ in range(6):
+            queue.submit(job)
+        await queue.join()
+
+        self.assertEqual(peak, 2)
+
+    async def test_failed_job_does_not_stop_queue(self):
+        queue = WorkQueue(workers=1)
+        done = []
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        async def ok():
+            done.append(True)
+
+        queue.submit(failing)
+        queue.submit(ok)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            await queue.join()
+
+        self.assertEqual(done, [True])
+        self.assertEqual(queue.failed, 1)
+
+    async def test_workers_outlive_join(self):
+        queue = WorkQueue(workers=2)
+        done = []
+
+        async def job(i):
+            done.append(i)
+
+        queue.submit(job, 1)
+        await queue.join()
+        queue.submit(job, 2)  # Later submissions reuse the running workers
+        await queue.join()
+        self.assertEqual(done, [1, 2])
+        self.assertEqual(len(queue._tasks), 2)
+
+        await queue.close()
+        self.assertEqual(queue.pending(), 0)